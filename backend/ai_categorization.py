@@ -1,7 +1,15 @@
 """AI-powered ticket categorization service."""
-from typing import Optional, List, Dict
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, List, Dict, Sequence, Tuple
 from sqlalchemy.orm import Session
-from models import Category, Ticket, TicketPriority
+from models import Ticket, TicketPriority
+from keyword_matcher import KeywordMatcher, KeywordHits, tokenize
+from cache import LRUCache
+from category_directory import category_directory
+from schemas import CategoryResponse
+from ticket_classifier import ticket_classifier, Prediction
+from config import settings
 import re
 
 
@@ -52,19 +60,69 @@ class AICategorizationService:
         ]
     }
 
-    def suggest_category(self, title: str, description: str, db: Session) -> Optional[Category]:
+    # Common IT terms extracted as tags
+    TAG_TERMS = [
+        "password", "email", "vpn", "printer", "wifi", "network",
+        "software", "hardware", "access", "login", "installation",
+        "update", "error", "crash", "slow", "backup"
+    ]
+
+    # Words signalling urgency
+    URGENCY_KEYWORDS = [
+        "urgent", "emergency", "critical", "asap", "immediately",
+        "down", "broken", "not working", "cannot", "unable"
+    ]
+
+    def __init__(self):
+        # All keyword lists compiled once into a single matcher
+        self.matcher = KeywordMatcher({
+            "category": self.CATEGORY_KEYWORDS,
+            "priority": self.PRIORITY_KEYWORDS,
+            "tag": {term: [term] for term in self.TAG_TERMS},
+            "urgency": {"urgency": self.URGENCY_KEYWORDS},
+        })
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.analysis_cache = LRUCache(
+            maxsize=settings.AI_ANALYSIS_CACHE_SIZE,
+            ttl=settings.AI_ANALYSIS_CACHE_TTL
+        )
+
+    @staticmethod
+    def confident_label(prediction: Optional[Prediction], head: str):
+        """Return the model's label for a head if it clears the confidence threshold."""
+        if not prediction or head not in prediction:
+            return None
+        label, probability = prediction[head]
+        return label if probability >= settings.CLASSIFIER_MIN_CONFIDENCE else None
+
+    def match_keywords(self, title: str, description: str) -> KeywordHits:
+        """Scan ticket content once for all category/priority/tag/urgency keywords."""
+        return self.matcher.match(f"{title} {description}")
+
+    def suggest_category(
+        self,
+        title: str,
+        description: str,
+        db: Session,
+        hits: Optional[KeywordHits] = None,
+        prediction: Optional[Prediction] = None
+    ) -> Optional[CategoryResponse]:
         """Suggest category based on ticket content."""
-        # Combine title and description for analysis
-        content = f"{title} {description}".lower()
+        predicted = self.confident_label(prediction, "category")
+        if predicted is not None:
+            category = category_directory.get(db, predicted)
+            if category:
+                return category
+
+        hits = hits or self.match_keywords(title, description)
 
         # Score each category
         scores = {}
-        categories = db.query(Category).all()
-        category_map = {cat.name: cat for cat in categories}
+        category_map = category_directory.by_name(db)
 
-        for category_name, keywords in self.CATEGORY_KEYWORDS.items():
+        for category_name in self.CATEGORY_KEYWORDS:
             if category_name in category_map:
-                score = sum(1 for keyword in keywords if keyword in content)
+                score = len(hits["category"].get(category_name, ()))
                 if score > 0:
                     scores[category_name] = score
 
@@ -75,14 +133,23 @@ class AICategorizationService:
 
         return None
 
-    def suggest_priority(self, title: str, description: str) -> TicketPriority:
+    def suggest_priority(
+        self,
+        title: str,
+        description: str,
+        hits: Optional[KeywordHits] = None,
+        prediction: Optional[Prediction] = None
+    ) -> TicketPriority:
         """Suggest priority based on ticket content."""
-        content = f"{title} {description}".lower()
+        predicted = self.confident_label(prediction, "priority")
+        if predicted is not None:
+            return predicted
+
+        hits = hits or self.match_keywords(title, description)
 
         # Check for critical keywords first
-        for priority, keywords in self.PRIORITY_KEYWORDS.items():
-            keyword_count = sum(1 for keyword in keywords if keyword in content)
-            if keyword_count > 0:
+        for priority in self.PRIORITY_KEYWORDS:
+            if hits["priority"].get(priority):
                 return priority
 
         # Default to medium if no keywords matched
@@ -95,14 +162,102 @@ class AICategorizationService:
         db: Session
     ) -> Dict[str, any]:
         """Analyze ticket and provide suggestions."""
-        suggested_category = self.suggest_category(title, description, db)
-        suggested_priority = self.suggest_priority(title, description)
+        key = self.analysis_key(title, description)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            return dict(cached)
+
+        hits = self.match_keywords(title, description)
+        # The trained model replaces keyword rules when it is confident enough
+        prediction = ticket_classifier.predict(title, description) if ticket_classifier.available else None
+
+        analysis = self._build_analysis(title, description, db, hits, prediction)
+        self.analysis_cache.set(key, analysis)
+        return dict(analysis)
+
+    def analyze_batch(
+        self,
+        items: Sequence[Tuple[str, str]],
+        db: Session
+    ) -> List[Dict[str, any]]:
+        """Analyze many (title, description) pairs, returning results in input order."""
+        keys = [self.analysis_key(title, description) for title, description in items]
+        results: List[Optional[Dict[str, any]]] = [self.analysis_cache.get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if missing:
+            pending = [items[i] for i in missing]
+            hits_list = self.match_keywords_batch([f"{title} {description}" for title, description in pending])
+            # One vectorized model call covers the whole batch
+            if ticket_classifier.available:
+                predictions = ticket_classifier.predict_batch(pending)
+            else:
+                predictions = [None] * len(pending)
+
+            for i, (title, description), hits, prediction in zip(missing, pending, hits_list, predictions):
+                results[i] = self._build_analysis(title, description, db, hits, prediction)
+                self.analysis_cache.set(keys[i], results[i])
+
+        return [dict(result) for result in results]
+
+    @staticmethod
+    def analysis_key(title: str, description: str) -> str:
+        """Cache key for ticket content, scoped to the current categories and model.
+
+        Text is normalized to the word tokens the matcher and classifier see,
+        so edits to case, punctuation or whitespace reuse the cached result.
+        """
+        normalized = "\n".join((
+            " ".join(tokenize(title)),
+            " ".join(tokenize(description)),
+            str(category_directory.version),
+            ticket_classifier.version,
+        ))
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+    def match_keywords_batch(self, texts: Sequence[str]) -> List[KeywordHits]:
+        """Scan many texts, fanning large batches out to worker processes."""
+        workers = settings.AI_BATCH_WORKERS
+        if workers <= 0 or len(texts) < settings.AI_BATCH_PARALLEL_THRESHOLD:
+            return [self.matcher.match(text) for text in texts]
+
+        chunk_size = -(-len(texts) // workers)
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        hits_list: List[KeywordHits] = []
+        # map() yields chunk results in submission order
+        for chunk_hits in self._get_executor().map(_match_chunk, chunks):
+            hits_list.extend(chunk_hits)
+        return hits_list
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=settings.AI_BATCH_WORKERS)
+        return self._executor
+
+    def shutdown(self):
+        """Shut down the batch worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _build_analysis(
+        self,
+        title: str,
+        description: str,
+        db: Session,
+        hits: KeywordHits,
+        prediction: Optional[Prediction]
+    ) -> Dict[str, any]:
+        """Assemble suggestions from keyword hits and an optional model prediction."""
+        suggested_category = self.suggest_category(title, description, db, hits=hits, prediction=prediction)
+        suggested_priority = self.suggest_priority(title, description, hits=hits, prediction=prediction)
 
         # Extract potential tags
-        tags = self.extract_tags(f"{title} {description}")
+        tags = self.extract_tags(f"{title} {description}", hits=hits)
 
         # Detect sentiment/urgency
-        urgency_score = self.calculate_urgency(title, description)
+        urgency_score = self.calculate_urgency(title, description, hits=hits)
 
         return {
             "suggested_category_id": suggested_category.id if suggested_category else None,
@@ -110,37 +265,26 @@ class AICategorizationService:
             "suggested_priority": suggested_priority.value,
             "urgency_score": urgency_score,
             "suggested_tags": tags[:5],  # Top 5 tags
-            "confidence": self.calculate_confidence(title, description, suggested_category)
+            "confidence": self.calculate_confidence(
+                title, description, suggested_category, hits=hits, prediction=prediction
+            )
         }
 
-    def extract_tags(self, content: str) -> List[str]:
+    def extract_tags(self, content: str, hits: Optional[KeywordHits] = None) -> List[str]:
         """Extract potential tags from content."""
-        content = content.lower()
-        tags = []
-
-        # Extract common IT terms
-        it_terms = [
-            "password", "email", "vpn", "printer", "wifi", "network",
-            "software", "hardware", "access", "login", "installation",
-            "update", "error", "crash", "slow", "backup"
-        ]
-
-        for term in it_terms:
-            if term in content:
-                tags.append(term)
+        hits = hits or self.matcher.match(content)
+        return [term for term in self.TAG_TERMS if hits["tag"].get(term)]
 
-        return tags
-
-    def calculate_urgency(self, title: str, description: str) -> float:
+    def calculate_urgency(
+        self,
+        title: str,
+        description: str,
+        hits: Optional[KeywordHits] = None
+    ) -> float:
         """Calculate urgency score (0-1)."""
-        content = f"{title} {description}".lower()
-
-        urgent_words = [
-            "urgent", "emergency", "critical", "asap", "immediately",
-            "down", "broken", "not working", "cannot", "unable"
-        ]
+        hits = hits or self.match_keywords(title, description)
 
-        urgency_count = sum(1 for word in urgent_words if word in content)
+        urgency_count = len(hits["urgency"].get("urgency", ()))
 
         # Normalize to 0-1 scale
         max_urgency = 5
@@ -150,27 +294,78 @@ class AICategorizationService:
         self,
         title: str,
         description: str,
-        suggested_category: Optional[Category]
+        suggested_category: Optional[CategoryResponse],
+        hits: Optional[KeywordHits] = None,
+        prediction: Optional[Prediction] = None
     ) -> float:
         """Calculate confidence level for suggestions (0-1)."""
         if not suggested_category:
             return 0.0
 
-        content = f"{title} {description}".lower()
+        # Model suggestions report the predicted probability
+        if self.confident_label(prediction, "category") == suggested_category.id:
+            return round(prediction["category"][1], 2)
 
         # Get keywords for suggested category
         keywords = self.CATEGORY_KEYWORDS.get(suggested_category.name, [])
 
-        # Count matches
-        matches = sum(1 for keyword in keywords if keyword in content)
-
         # Normalize confidence
         if len(keywords) == 0:
             return 0.5
 
+        # Count matches
+        hits = hits or self.match_keywords(title, description)
+        matches = len(hits["category"].get(suggested_category.name, ()))
+
         confidence = min(matches / 3, 1.0)  # 3+ matches = 100% confidence
         return round(confidence, 2)
 
 
 # Global AI categorization service instance
 ai_service = AICategorizationService()
+
+
+def _match_chunk(texts: Sequence[str]) -> List[KeywordHits]:
+    """Scan a chunk of texts with the compiled matcher (runs inside a worker process)."""
+    return [ai_service.matcher.match(text) for text in texts]
+
+
+def benchmark(repeat: int = 200, words: int = 2000):
+    """Compare the single-pass matcher with per-keyword substring scans."""
+    import random
+    import time
+
+    vocabulary = (
+        "the user reports that their laptop screen flickers when the hdmi cable is connected "
+        "and the vpn connection drops every few minutes outlook also crashes on startup "
+        "please advise lorem ipsum dolor sit amet server backup schedule printer queue"
+    ).split()
+    title = "Laptop and VPN problems"
+    description = " ".join(random.Random(42).choices(vocabulary, k=words))
+    service = AICategorizationService()
+
+    def substring_scan():
+        content = f"{title} {description}".lower()
+        for keywords in service.CATEGORY_KEYWORDS.values():
+            sum(1 for keyword in keywords if keyword in content)
+        for keywords in service.PRIORITY_KEYWORDS.values():
+            sum(1 for keyword in keywords if keyword in content)
+        [term for term in service.TAG_TERMS if term in content]
+        sum(1 for word in service.URGENCY_KEYWORDS if word in content)
+        for keywords in service.CATEGORY_KEYWORDS.values():
+            sum(1 for keyword in keywords if keyword in content)
+
+    def single_pass():
+        service.match_keywords(title, description)
+
+    print(f"Description length: {len(description)} characters ({words} words)")
+    for name, func in (("substring scans", substring_scan), ("single-pass matcher", single_pass)):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = (time.perf_counter() - start) / repeat
+        print(f"{name:>20}: {elapsed * 1000:.3f} ms per analysis")
+
+
+if __name__ == "__main__":
+    benchmark()
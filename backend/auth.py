@@ -1,23 +1,27 @@
 """Authentication and authorization utilities."""
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from cache import LRUCache
 from config import settings
 from database import get_db
-from models import User, UserRole
+from models import User, UserRole, UsedRefreshToken
 from schemas import TokenData
-
-# Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from password_hashing import pwd_context, password_hasher
+from token_versions import token_versions
 
 # HTTP Bearer token security
 security = HTTPBearer()
 
+# Recently authenticated users: user id -> (token version, detached User)
+principal_cache = LRUCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -37,12 +41,41 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "type": "access"})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
-def decode_token(token: str) -> TokenData:
+def create_refresh_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    """Create long-lived JWT refresh token."""
+    to_encode = data.copy()
+    expire = datetime.utcnow() + (expires_delta or timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS))
+
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def issue_tokens(user: User, token_version: Optional[int] = None) -> Dict[str, object]:
+    """Issue an access/refresh token pair for a user."""
+    if token_version is None:
+        token_version = token_versions.current(user.id)
+
+    # python-jose requires the subject to be a string
+    claims = {"sub": str(user.id), "ver": token_version}
+    access_token = create_access_token(
+        data={**claims, "username": user.username, "role": user.role.value}
+    )
+    refresh_token = create_refresh_token(data=claims)
+
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
+def decode_token(token: str, token_type: str = "access") -> TokenData:
     """Decode and validate JWT token."""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -52,47 +85,133 @@ def decode_token(token: str) -> TokenData:
 
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        user_id: int = payload.get("sub")
+        subject = payload.get("sub")
         username: str = payload.get("username")
 
-        if user_id is None:
+        if subject is None:
+            raise credentials_exception
+        # Tokens issued before refresh tokens existed carry no type
+        if payload.get("type", "access") != token_type:
             raise credentials_exception
 
-        return TokenData(user_id=user_id, username=username)
-    except JWTError:
+        role = payload.get("role")
+        expires = payload.get("exp")
+        return TokenData(
+            user_id=int(subject),
+            username=username,
+            role=UserRole(role) if role else None,
+            token_version=payload.get("ver", 0),
+            expires_at=datetime.utcfromtimestamp(expires) if expires else None,
+            token_id=payload.get("jti")
+        )
+    except (JWTError, ValueError):
         raise credentials_exception
 
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
     """Authenticate user with username and password."""
     user = db.query(User).filter(User.username == username).first()
 
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+
+    valid, new_hash = await password_hasher.verify_and_update(password, user.password_hash)
+    if not valid:
         return None
     if not user.is_active:
         return None
 
+    # Transparently upgrade hashes made with outdated cost parameters
+    if new_hash:
+        user.password_hash = new_hash
+        db.commit()
+
     return user
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from token."""
-    token = credentials.credentials
-    token_data = decode_token(token)
+def principal_snapshot(user: User) -> User:
+    """Detached copy of a user's profile (without the password hash) safe to share between requests."""
+    return User(**{
+        column.name: getattr(user, column.name)
+        for column in User.__table__.columns
+        if column.name != "password_hash"
+    })
+
+
+def invalidate_principal(user_id: int):
+    """Drop a cached principal after the user's role, status or profile changes."""
+    principal_cache.delete(user_id)
+
+
+def revoke_tokens(db: Session, user_id: int) -> int:
+    """Revoke all access and refresh tokens issued to a user."""
+    version = token_versions.revoke(db, user_id)
+    invalidate_principal(user_id)
+    return version
+
+
+def consume_refresh_token(db: Session, token_data: TokenData) -> Optional[datetime]:
+    """Mark a refresh token as used.
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
-    if user is None:
+    Returns None on first use; otherwise when the token was first used.
+    """
+    db.add(UsedRefreshToken(
+        jti=token_data.token_id,
+        user_id=token_data.user_id,
+        used_at=datetime.utcnow(),
+        expires_at=token_data.expires_at or datetime.utcnow()
+    ))
+    try:
+        db.commit()
+        return None
+    except IntegrityError:
+        db.rollback()
+        return db.query(UsedRefreshToken.used_at).filter(
+            UsedRefreshToken.jti == token_data.token_id
+        ).scalar()
+
+
+def prune_used_refresh_tokens(db: Session) -> int:
+    """Forget used refresh tokens that have expired anyway."""
+    deleted = db.query(UsedRefreshToken).filter(
+        UsedRefreshToken.expires_at < datetime.utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+
+async def get_token_data(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenData:
+    """Decode the bearer access token and reject revoked tokens."""
+    token_data = decode_token(credentials.credentials)
+
+    if not token_versions.is_current(token_data.user_id, token_data.token_version):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail="Token has been revoked",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    return token_data
+
+
+def load_principal(token_data: TokenData, db: Session) -> User:
+    """Return the (cached) user a validated token belongs to."""
+    cached = principal_cache.get(token_data.user_id)
+    if cached is not None and cached[0] == token_data.token_version:
+        user = cached[1]
+    else:
+        user = db.query(User).filter(User.id == token_data.user_id).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = principal_snapshot(user)
+        principal_cache.set(token_data.user_id, (token_data.token_version, user))
+
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -102,6 +221,14 @@ async def get_current_user(
     return user
 
 
+async def get_current_user(
+    token_data: TokenData = Depends(get_token_data),
+    db: Session = Depends(get_db)
+) -> User:
+    """Get current authenticated user from token."""
+    return load_principal(token_data, db)
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -111,12 +238,22 @@ async def get_current_active_user(
 
 def require_role(*allowed_roles: UserRole):
     """Dependency to require specific user roles."""
-    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
+    async def role_checker(
+        token_data: TokenData = Depends(get_token_data),
+        db: Session = Depends(get_db)
+    ) -> User:
+        insufficient = HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Insufficient permissions"
+        )
+        # Role changes revoke the user's tokens, so the role claim can be trusted
+        # to reject requests before the user is loaded
+        if token_data.role is not None and token_data.role not in allowed_roles:
+            raise insufficient
+
+        current_user = load_principal(token_data, db)
         if current_user.role not in allowed_roles:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Insufficient permissions"
-            )
+            raise insufficient
         return current_user
     return role_checker
 
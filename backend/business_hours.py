@@ -0,0 +1,175 @@
+"""Business-time arithmetic over precomputed working intervals."""
+import threading
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, List, Optional, Sequence, Set, Tuple, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+import numpy as np
+
+from config import settings
+
+
+Timestamps = Union[datetime, Sequence[datetime]]
+
+# Interval starts, ends, and working seconds before and through each interval
+Table = Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(value: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are UTC as everywhere else in the app."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - EPOCH).total_seconds()
+
+
+def from_epoch(seconds: float) -> datetime:
+    """Naive UTC datetime for epoch seconds."""
+    return datetime.fromtimestamp(float(seconds), tz=timezone.utc).replace(tzinfo=None)
+
+
+def to_epochs(values: Timestamps) -> np.ndarray:
+    """Epoch seconds for one or many datetimes."""
+    if isinstance(values, datetime):
+        return np.array([to_epoch(values)])
+    return np.fromiter((to_epoch(value) for value in values), dtype=np.float64, count=len(values))
+
+
+def from_epochs(seconds: np.ndarray) -> List[datetime]:
+    """Naive UTC datetimes for an array of epoch seconds."""
+    return np.round(seconds * 1e6).astype(np.int64).astype("datetime64[us]").tolist()
+
+
+def parse_work_days(value: Union[str, Iterable[int]]) -> List[int]:
+    """Weekday numbers (Monday = 0) from their stored comma-separated form."""
+    if isinstance(value, str):
+        return [int(day) for day in value.split(",") if day.strip()]
+    return list(value)
+
+
+def validate_calendar(tz_name: str, work_days: Iterable[int], work_start: time, work_end: time) -> Optional[str]:
+    """Return an error message if a calendar definition is unusable."""
+    try:
+        ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return f"Unknown timezone '{tz_name}'"
+    days = list(work_days)
+    if not days or any(day < 0 or day > 6 for day in days):
+        return "work_days must list weekdays between 0 (Monday) and 6 (Sunday)"
+    if work_start >= work_end:
+        return "work_start must be before work_end"
+    return None
+
+
+class BusinessHours:
+    """Working intervals of a business calendar with prefix sums of working time.
+
+    Each working day contributes one [start, end) interval in UTC epoch
+    seconds, so daylight saving shifts are already applied. With the
+    cumulative working seconds before every interval, the business time
+    up to any instant is one binary search, and a deadline is the inverse:
+    a binary search over the cumulative totals. Both accept arrays, so
+    whole ticket sets are evaluated in one vectorized pass. The table
+    covers a window around today and is extended on demand.
+    """
+
+    def __init__(self, tz_name: str, work_days: Iterable[int], work_start: time, work_end: time,
+                 holidays: Iterable[date] = ()):
+        self.tz = ZoneInfo(tz_name)
+        self.work_days = frozenset(work_days)
+        self.work_start = work_start
+        self.work_end = work_end
+        self.holidays: Set[date] = set(holidays)
+        self._lock = threading.Lock()
+
+        today = datetime.utcnow().date()
+        self._first_day = today - timedelta(days=settings.SLA_CALENDAR_PAST_DAYS)
+        self._last_day = today + timedelta(days=settings.SLA_CALENDAR_FUTURE_DAYS)
+        self._table = self._build(self._first_day, self._last_day)
+
+    @classmethod
+    def from_calendar(cls, calendar) -> "BusinessHours":
+        """Build from a ``BusinessCalendar`` row (with holidays loaded)."""
+        return cls(
+            calendar.timezone, parse_work_days(calendar.work_days), calendar.work_start, calendar.work_end,
+            (holiday.date for holiday in calendar.holidays)
+        )
+
+    def _build(self, first_day: date, last_day: date) -> Table:
+        """Interval starts, ends, and working seconds before and through each interval."""
+        starts, ends = [], []
+        day = first_day
+        while day <= last_day:
+            if day.weekday() in self.work_days and day not in self.holidays:
+                starts.append(datetime.combine(day, self.work_start, tzinfo=self.tz).timestamp())
+                ends.append(datetime.combine(day, self.work_end, tzinfo=self.tz).timestamp())
+            day += timedelta(days=1)
+
+        starts = np.array(starts, dtype=np.float64)
+        ends = np.array(ends, dtype=np.float64)
+        through = np.cumsum(ends - starts)
+        before = through - (ends - starts)
+        return starts, ends, before, through
+
+    def _cover(self, low: float, high: float) -> Table:
+        """Return a table snapshot covering epoch seconds ``low`` to ``high``, extending it if needed.
+
+        Extending backward restarts the cumulative sums, so every offset a
+        caller compares must come from the same snapshot.
+        """
+        first_day = from_epoch(low).date() - timedelta(days=1)
+        last_day = from_epoch(high).date() + timedelta(days=1)
+        with self._lock:
+            if first_day < self._first_day or last_day > self._last_day:
+                first_day = min(first_day, self._first_day)
+                last_day = max(last_day, self._last_day)
+                self._table = self._build(first_day, last_day)
+                self._first_day, self._last_day = first_day, last_day
+            return self._table
+
+    def _covering(self, seconds: np.ndarray) -> Table:
+        """Table snapshot covering every instant in ``seconds``."""
+        if not seconds.size:
+            return self._table
+        return self._cover(seconds.min(), seconds.max())
+
+    @staticmethod
+    def _offsets(table: Table, seconds: np.ndarray) -> np.ndarray:
+        """Working seconds between the start of the table and each instant."""
+        starts, ends, before, _ = table
+        index = np.searchsorted(starts, seconds, side="right") - 1
+        clamped = np.maximum(index, 0)
+        within = np.clip(seconds - starts[clamped], 0, ends[clamped] - starts[clamped])
+        return np.where(index >= 0, before[clamped] + within, 0.0)
+
+    def elapsed_hours(self, start: Timestamps, end: Timestamps) -> Union[float, np.ndarray]:
+        """Business hours between ``start`` and ``end`` (element-wise for sequences)."""
+        start_seconds, end_seconds = to_epochs(start), to_epochs(end)
+        table = self._covering(np.concatenate([start_seconds, end_seconds]))
+        hours = (self._offsets(table, end_seconds) - self._offsets(table, start_seconds)) / 3600
+        return float(hours[0]) if isinstance(start, datetime) else hours
+
+    def add_hours(self, start: Timestamps, hours: Union[float, Sequence[float]]) -> Union[datetime, List[datetime]]:
+        """Instant at which ``hours`` business hours have passed since ``start``."""
+        seconds = to_epochs(start)
+        durations = np.asarray(hours, dtype=np.float64) * 3600
+        table = self._covering(seconds)
+
+        # Grow the table forward until every target falls inside it
+        while True:
+            targets = self._offsets(table, seconds) + durations
+            starts, ends, before, through = table
+            if not targets.size or (through.size and targets.max() <= through[-1]):
+                break
+            horizon = ends[-1] if ends.size else seconds.max()
+            table = self._cover(seconds.min(), horizon + 366 * 86400)
+
+        index = np.searchsorted(through, targets, side="left")
+        # A deadline never precedes its start (zero hours outside working time)
+        deadlines = np.maximum(starts[index] + (targets - before[index]), seconds)
+        return from_epoch(deadlines[0]) if isinstance(start, datetime) else from_epochs(deadlines)
+
+    def __len__(self) -> int:
+        return len(self._table[0])
@@ -0,0 +1,90 @@
+"""Cached directory of ticket categories."""
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import Category
+from schemas import CategoryResponse
+from http_cache import make_etag
+
+
+class CategoryDirectory:
+    """In-memory snapshot of all categories with version-based invalidation.
+
+    Categories change rarely but are read by every AI suggestion and
+    category listing. The snapshot is reloaded only after ``invalidate``
+    bumps the version (on create/delete) or the TTL expires, so that
+    other worker processes eventually pick up changes too.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self._snapshot: Optional[List[CategoryResponse]] = None
+        self._by_id: Dict[int, CategoryResponse] = {}
+        self._by_name: Dict[str, CategoryResponse] = {}
+        self._etag = ""
+        self._snapshot_version = -1
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._snapshot is not None
+            and self._snapshot_version == self.version
+            and time.monotonic() - self._loaded_at < self.ttl
+        )
+
+    def _load(self, db: Session):
+        """Reload the snapshot from the database if it is stale."""
+        if self._is_fresh():
+            return
+        with self._lock:
+            if self._is_fresh():
+                return
+            version = self.version
+            categories = [
+                CategoryResponse.model_validate(category)
+                for category in db.query(Category).order_by(Category.id).all()
+            ]
+            self._by_id = {category.id: category for category in categories}
+            self._by_name = {category.name: category for category in categories}
+            self._snapshot = categories
+            # Derived from the content, so it is the same in every worker process
+            self._etag = make_etag(
+                "categories", len(categories), *(category.model_dump_json() for category in categories)
+            )
+            self._snapshot_version = version
+            self._loaded_at = time.monotonic()
+
+    def all(self, db: Session) -> List[CategoryResponse]:
+        """Return all categories ordered by id."""
+        self._load(db)
+        return self._snapshot
+
+    def get(self, db: Session, category_id: int) -> Optional[CategoryResponse]:
+        """Return a category by id."""
+        self._load(db)
+        return self._by_id.get(category_id)
+
+    def by_name(self, db: Session) -> Dict[str, CategoryResponse]:
+        """Return categories keyed by name."""
+        self._load(db)
+        return self._by_name
+
+    def etag(self, db: Session) -> str:
+        """Return the ETag of the current snapshot."""
+        self._load(db)
+        return self._etag
+
+    def invalidate(self):
+        """Mark the snapshot stale after categories change."""
+        with self._lock:
+            self.version += 1
+
+
+# Global category directory instance
+category_directory = CategoryDirectory(ttl=settings.CATEGORY_CACHE_TTL)
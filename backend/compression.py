@@ -0,0 +1,142 @@
+"""Transparent at-rest compression for stored attachments."""
+import gzip
+import os
+import shutil
+from typing import BinaryIO, Iterator, Optional
+
+from config import settings
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+
+CHUNK_SIZE = 64 * 1024
+
+# Content-Encoding -> file suffix appended to compressed blobs
+ENCODING_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+
+def resolve_storage_encoding(configured: str) -> Optional[str]:
+    """Validate the configured compression encoding, returning None if disabled."""
+    encoding = configured.strip().lower()
+    if encoding in ("", "none"):
+        return None
+    if encoding not in ENCODING_SUFFIXES:
+        raise ValueError(
+            f"Unsupported ATTACHMENT_COMPRESSION '{configured}'; use none, gzip or zstd"
+        )
+    if encoding == "zstd" and zstandard is None:
+        print("⚠️  zstandard is not installed, falling back to gzip attachment compression")
+        return "gzip"
+    return encoding
+
+
+# Resolved once at import so bad configuration fails at startup, not on upload
+STORAGE_ENCODING = resolve_storage_encoding(settings.ATTACHMENT_COMPRESSION)
+
+
+def get_storage_encoding() -> Optional[str]:
+    """Return the configured compression encoding, or None if disabled."""
+    return STORAGE_ENCODING
+
+
+def is_compressible(mime_type: Optional[str]) -> bool:
+    """Check whether a MIME type should be compressed at rest."""
+    if not mime_type:
+        return False
+    mime_type = mime_type.split(";")[0].strip().lower()
+    for pattern in settings.compressible_mime_types_list:
+        if pattern.endswith("/*"):
+            if mime_type.startswith(pattern[:-1]):
+                return True
+        elif mime_type == pattern:
+            return True
+    return False
+
+
+def get_file_encoding(file_path: str) -> Optional[str]:
+    """Return the Content-Encoding of a stored blob based on its suffix."""
+    for encoding, suffix in ENCODING_SUFFIXES.items():
+        if file_path.endswith(suffix):
+            return encoding
+    return None
+
+
+def _open_writer(file_path: str, encoding: str) -> BinaryIO:
+    """Open a compressing writer for the given encoding."""
+    if encoding == "zstd":
+        level = settings.ATTACHMENT_COMPRESSION_LEVEL or 3
+        compressor = zstandard.ZstdCompressor(level=level)
+        return compressor.stream_writer(open(file_path, "wb"), closefd=True)
+    level = settings.ATTACHMENT_COMPRESSION_LEVEL or 6
+    return gzip.open(file_path, "wb", compresslevel=level)
+
+
+def _open_reader(file_path: str, encoding: str) -> BinaryIO:
+    """Open a decompressing reader for the given encoding."""
+    if encoding == "zstd":
+        decompressor = zstandard.ZstdDecompressor()
+        return decompressor.stream_reader(open(file_path, "rb"), closefd=True)
+    return gzip.open(file_path, "rb")
+
+
+def write_blob(source: BinaryIO, file_path: str, mime_type: Optional[str]) -> str:
+    """Write an upload to disk, compressing it if worthwhile.
+
+    Returns the path the blob was stored at, which carries an encoding
+    suffix when the blob was compressed.
+    """
+    encoding = get_storage_encoding() if is_compressible(mime_type) else None
+
+    if encoding:
+        compressed_path = f"{file_path}{ENCODING_SUFFIXES[encoding]}"
+        with _open_writer(compressed_path, encoding) as writer:
+            shutil.copyfileobj(source, writer, CHUNK_SIZE)
+
+        # Keep the original if compression does not save at least 10%
+        original_size = source.tell()
+        if os.path.getsize(compressed_path) < original_size * 0.9:
+            return compressed_path
+
+        os.remove(compressed_path)
+        source.seek(0)
+
+    with open(file_path, "wb") as buffer:
+        shutil.copyfileobj(source, buffer, CHUNK_SIZE)
+    return file_path
+
+
+def iter_decompressed(file_path: str) -> Iterator[bytes]:
+    """Stream a stored blob, decompressing it on the fly."""
+    encoding = get_file_encoding(file_path)
+    opener = (lambda: _open_reader(file_path, encoding)) if encoding else (lambda: open(file_path, "rb"))
+
+    with opener() as reader:
+        while True:
+            chunk = reader.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def accepts_encoding(accept_encoding: Optional[str], encoding: str) -> bool:
+    """Check whether an Accept-Encoding header allows the given encoding."""
+    if not accept_encoding:
+        return False
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() not in (encoding, "*"):
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                return float(params[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
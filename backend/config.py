@@ -19,7 +19,13 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_VERSION_REFRESH_SECONDS: float = 30.0
+    REFRESH_TOKEN_REUSE_GRACE_SECONDS: int = 30
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
 
     # Database
     DATABASE_URL: str = "sqlite:///./digiskills.db"
@@ -39,6 +45,60 @@ class Settings(BaseSettings):
     MAX_FILE_SIZE: int = 10485760  # 10MB
     ALLOWED_FILE_TYPES: str = "pdf,doc,docx,jpg,jpeg,png,gif,txt"
     UPLOAD_DIR: str = "./uploads"
+    ATTACHMENT_COMPRESSION: str = "gzip"  # none, gzip or zstd
+    ATTACHMENT_COMPRESSION_LEVEL: int = 0  # 0 uses the codec default
+    COMPRESSIBLE_MIME_TYPES: str = "text/*,application/json,application/xml"
+
+    # Attachment Previews
+    PREVIEW_ENABLED: bool = True
+    PREVIEW_WORKERS: int = 2
+    THUMBNAIL_SIZE: int = 256
+    PREVIEW_SIZE: int = 1024
+
+    # AI Classifier
+    CLASSIFIER_MODEL_PATH: str = "./models/ticket_classifier.npz"
+    CLASSIFIER_FEATURES: int = 65536
+    CLASSIFIER_MIN_CONFIDENCE: float = 0.4
+    AI_BATCH_MAX_ITEMS: int = 500
+    AI_BATCH_WORKERS: int = 0  # 0 analyzes batches in-process
+    AI_BATCH_PARALLEL_THRESHOLD: int = 200
+    AI_ANALYSIS_CACHE_SIZE: int = 2000
+    AI_ANALYSIS_CACHE_TTL: float = 600.0
+
+    # Tickets
+    TICKET_BULK_MAX: int = 5000
+    IMPORT_BATCH_SIZE: int = 2000
+    IMPORT_MAX_ERRORS: int = 1000
+    TICKET_CHANGES_MAX: int = 1000
+    TICKET_CHANGE_RETENTION_DAYS: int = 90
+
+    # Real-time events (Server-Sent Events at /api/events/tickets)
+    EVENT_STREAM_MAX_PENDING: int = 1000
+    EVENT_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    EVENT_STREAM_RETRY_MS: int = 5000
+
+    # Duplicate Detection
+    DUPLICATE_DETECTION_ENABLED: bool = True
+    DUPLICATE_THRESHOLD: float = 0.5
+    DUPLICATE_WINDOW_HOURS: int = 24
+    DUPLICATE_AUTO_MERGE: bool = False
+
+    # Caching
+    CATEGORY_CACHE_TTL: float = 300.0
+    SLA_CACHE_TTL: float = 300.0
+    SLA_CALENDAR_PAST_DAYS: int = 730  # Business-hours tables span this window and grow on demand
+    SLA_CALENDAR_FUTURE_DAYS: int = 730
+    SLA_AT_RISK_REFRESH_SECONDS: float = 300.0
+    SLA_AT_RISK_COMPACT_SLACK: int = 1000  # Stale heap entries tolerated before a rebuild
+    PRINCIPAL_CACHE_SIZE: int = 10000
+    PRINCIPAL_CACHE_TTL: float = 30.0
+
+    # Knowledge Base
+    KB_COUNTER_FLUSH_SECONDS: float = 5.0
+    KB_ARTICLE_CACHE_SIZE: int = 1000
+    KB_ARTICLE_CACHE_TTL: float = 300.0
+    KB_SUGGESTION_LIMIT: int = 3
+    KB_SUGGESTION_MIN_SCORE: float = 0.1
 
     # Admin User
     ADMIN_EMAIL: str = "admin@digiskills.local"
@@ -55,6 +115,11 @@ class Settings(BaseSettings):
         """Return allowed file types as a list."""
         return [ft.strip() for ft in self.ALLOWED_FILE_TYPES.split(",")]
 
+    @property
+    def compressible_mime_types_list(self) -> List[str]:
+        """Return MIME types compressed at rest as a list."""
+        return [mt.strip().lower() for mt in self.COMPRESSIBLE_MIME_TYPES.split(",") if mt.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
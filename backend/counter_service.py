@@ -0,0 +1,107 @@
+"""Buffered counters for knowledge base article statistics."""
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from config import settings
+from database import engine
+
+
+# Counter columns that can be buffered
+COUNTER_FIELDS = ("view_count", "helpful_count", "not_helpful_count")
+
+
+class CounterBuffer:
+    """Aggregates counter increments in memory and flushes them in batches.
+
+    Increments are applied with ``SET column = column + n`` so concurrent
+    writers never lose updates, and page views no longer write to the
+    database on the request path.
+    """
+
+    def __init__(self, table: str, flush_interval: float):
+        self.table = table
+        self.flush_interval = flush_interval
+        self._counts: Dict[int, Dict[str, int]] = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._flush_listeners: List[Callable[[Dict[int, Dict[str, int]], int], None]] = []
+        # Bumped when a flush takes the buffered increments; rows read from the
+        # database before that cannot include them yet
+        self.generation = 0
+
+    def add_flush_listener(self, listener: Callable[[Dict[int, Dict[str, int]], int], None]):
+        """Register a callback invoked with the increments written by each flush and its generation."""
+        self._flush_listeners.append(listener)
+
+    def increment(self, row_id: int, field: str, amount: int = 1):
+        """Buffer an increment of a counter column."""
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter field: {field}")
+        with self._lock:
+            self._counts[row_id][field] += amount
+
+    def pending(self, row_id: int) -> Dict[str, int]:
+        """Return increments for a row that have not been flushed yet."""
+        with self._lock:
+            counts = self._counts.get(row_id)
+            return dict(counts) if counts else dict.fromkeys(COUNTER_FIELDS, 0)
+
+    def flush(self) -> int:
+        """Write all buffered increments to the database."""
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+            if not counts:
+                return 0
+            self.generation += 1
+            generation = self.generation
+
+        assignments = ", ".join(f"{field} = COALESCE({field}, 0) + :{field}" for field in COUNTER_FIELDS)
+        statement = text(f"UPDATE {self.table} SET {assignments} WHERE id = :id")
+        params = [{"id": row_id, **row_counts} for row_id, row_counts in counts.items()]
+
+        try:
+            with engine.begin() as conn:
+                conn.execute(statement, params)
+        except Exception as e:
+            # Put the increments back so they are retried on the next flush
+            with self._lock:
+                for row_id, row_counts in counts.items():
+                    for field, amount in row_counts.items():
+                        self._counts[row_id][field] += amount
+            print(f"Failed to flush {self.table} counters: {str(e)}")
+            return 0
+
+        for listener in self._flush_listeners:
+            listener(counts, generation)
+
+        return len(params)
+
+    async def _run(self):
+        """Flush buffered counters periodically."""
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await asyncio.to_thread(self.flush)
+
+    def start(self):
+        """Start the background flush task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background flush task and flush remaining increments."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+# Global knowledge base article counter buffer
+kb_counter_buffer = CounterBuffer("kb_articles", settings.KB_COUNTER_FLUSH_SECONDS)
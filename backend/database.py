@@ -29,9 +29,11 @@ def get_db():
 def init_db():
     """Initialize database tables."""
     from models import (
-        User, Category, Ticket, TicketComment, TicketAttachment,
+        User, UserTokenVersion, Category,
+        Ticket, TicketComment, TicketAttachment, TicketSignature,
         TicketTemplate, SLAPolicy,
         KnowledgeBaseCategory, KnowledgeBaseArticle,
+        KnowledgeBaseTag, KnowledgeBaseArticleTag, KnowledgeBaseArticleRelation,
         Webhook, WebhookLog
     )
     Base.metadata.create_all(bind=engine)
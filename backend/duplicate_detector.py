@@ -0,0 +1,272 @@
+"""Near-duplicate ticket detection with MinHash signatures and LSH buckets."""
+import threading
+import zlib
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from config import settings
+from kb_suggestions import tokenize
+from models import Ticket, TicketSignature, TicketStatus
+
+
+NUM_PERMUTATIONS = 64
+BANDS = 32  # 32 bands of 2 rows: pairs with Jaccard >= 0.3 collide with ~95% probability
+ROWS = NUM_PERMUTATIONS // BANDS
+
+# Mersenne prime; shingle hashes are reduced modulo it first
+PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(1)
+# a * hash + b stays below 2**63 for a, b, hash < PRIME, so uint64 arithmetic is exact
+# and each (a, b) is a true random permutation of [0, PRIME)
+_A = _rng.randint(1, PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+_B = _rng.randint(1, PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+CLOSED_STATUSES = (TicketStatus.RESOLVED, TicketStatus.CLOSED)
+
+# Signature of text without any shingles; never matched
+EMPTY_SIGNATURE = np.full(NUM_PERMUTATIONS, np.iinfo(np.uint32).max, dtype=np.uint32)
+
+
+def shingles(title: str, description: str) -> Set[str]:
+    """Word unigrams and bigrams of ticket text, ignoring stop words."""
+    tokens = tokenize(f"{title} {description}")
+    return set(tokens) | {f"{first} {second}" for first, second in zip(tokens, tokens[1:])}
+
+
+def minhash(title: str, description: str) -> np.ndarray:
+    """Compute the MinHash signature of ticket text."""
+    grams = shingles(title, description)
+    if not grams:
+        return EMPTY_SIGNATURE
+
+    hashes = np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64, count=len(grams)) % PRIME
+    permuted = (hashes[:, None] * _A + _B) % PRIME
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimate Jaccard similarity from two signatures."""
+    return float(np.count_nonzero(first == second)) / NUM_PERMUTATIONS
+
+
+class DuplicateDetector:
+    """LSH index over open parent tickets for near-duplicate lookups.
+
+    Only open tickets that are not themselves duplicates are indexed, so a
+    lookup returns a ticket that can act as the parent incident. Each
+    signature is split into bands and a band value is a hash bucket key;
+    candidates are tickets sharing at least one bucket, which are then
+    verified against the estimated similarity threshold.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[int, bytes], Set[int]] = defaultdict(set)
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._created_at: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _bands(signature: np.ndarray):
+        for band in range(BANDS):
+            yield band, signature[band * ROWS:(band + 1) * ROWS].tobytes()
+
+    def _add(self, ticket_id: int, signature: np.ndarray, created_at: Optional[datetime]):
+        """Index a parent candidate (caller holds the lock)."""
+        self._remove(ticket_id)
+        for key in self._bands(signature):
+            self._buckets[key].add(ticket_id)
+        self._signatures[ticket_id] = signature
+        if created_at is not None and created_at.tzinfo is not None:
+            created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+        self._created_at[ticket_id] = created_at or datetime.utcnow()
+
+    def _remove(self, ticket_id: int):
+        """Drop a ticket from the index (caller holds the lock)."""
+        signature = self._signatures.pop(ticket_id, None)
+        self._created_at.pop(ticket_id, None)
+        if signature is None:
+            return
+        for key in self._bands(signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(ticket_id)
+                if not bucket:
+                    del self._buckets[key]
+
+    def find_parent(self, signature: np.ndarray, exclude: Optional[int] = None) -> Optional[Tuple[int, float]]:
+        """Return (ticket id, similarity) of the most similar recent open ticket."""
+        if np.array_equal(signature, EMPTY_SIGNATURE):
+            return None
+
+        threshold = settings.DUPLICATE_THRESHOLD
+        window_start = datetime.utcnow() - timedelta(hours=settings.DUPLICATE_WINDOW_HOURS)
+
+        with self._lock:
+            candidates: Set[int] = set()
+            for key in self._bands(signature):
+                candidates.update(self._buckets.get(key, ()))
+            candidates.discard(exclude)
+
+            best = None
+            for ticket_id in candidates:
+                if self._created_at[ticket_id] < window_start:
+                    continue
+                score = similarity(signature, self._signatures[ticket_id])
+                if score >= threshold and (best is None or (score, -ticket_id) > (best[1], -best[0])):
+                    best = (ticket_id, score)
+            return best
+
+    def link(self, db: Session, ticket: Ticket) -> Optional[Tuple[int, float]]:
+        """Store a new ticket's signature and link it to an open parent if one matches.
+
+        The caller commits. Returns (parent ticket id, similarity) when linked.
+        """
+        signature = minhash(ticket.title, ticket.description)
+        match = self.find_parent(signature, exclude=ticket.id) if settings.DUPLICATE_DETECTION_ENABLED else None
+
+        # The index may still hold tickets another worker deleted or closed,
+        # or whose creation was rolled back; drop those and look again
+        while match is not None and not db.query(Ticket.id).filter(
+            Ticket.id == match[0], Ticket.status.notin_(CLOSED_STATUSES)
+        ).first():
+            with self._lock:
+                self._remove(match[0])
+            match = self.find_parent(signature, exclude=ticket.id)
+
+        db.merge(TicketSignature(
+            ticket_id=ticket.id,
+            signature=signature.tobytes(),
+            parent_ticket_id=match[0] if match else None,
+            similarity=round(match[1], 4) if match else None
+        ))
+
+        # Duplicates never become parents themselves
+        if match is None and ticket.status not in CLOSED_STATUSES:
+            with self._lock:
+                self._add(ticket.id, signature, ticket.created_at)
+        return match
+
+    def sync(self, db: Session, ticket: Ticket):
+        """Refresh a ticket's signature and index membership after an update."""
+        signature = minhash(ticket.title, ticket.description)
+        row = db.query(TicketSignature).filter(TicketSignature.ticket_id == ticket.id).first()
+        if row is None:
+            row = TicketSignature(ticket_id=ticket.id)
+            db.add(row)
+        row.signature = signature.tobytes()
+
+        with self._lock:
+            if row.parent_ticket_id is None and ticket.status not in CLOSED_STATUSES:
+                self._add(ticket.id, signature, ticket.created_at)
+            else:
+                self._remove(ticket.id)
+
+    def sync_statuses(self, db: Session, ticket_ids: List[int]):
+        """Update index membership after a bulk status change, in one query."""
+        rows = db.query(
+            Ticket.id, Ticket.status, Ticket.created_at,
+            TicketSignature.signature, TicketSignature.parent_ticket_id
+        ).join(
+            TicketSignature, TicketSignature.ticket_id == Ticket.id
+        ).filter(Ticket.id.in_(ticket_ids)).all()
+
+        with self._lock:
+            for row in rows:
+                if row.parent_ticket_id is None and row.status not in CLOSED_STATUSES:
+                    self._add(row.id, np.frombuffer(row.signature, dtype=np.uint32), row.created_at)
+                else:
+                    self._remove(row.id)
+
+    def remove(self, db: Session, ticket_id: int):
+        """Delete a ticket's signature and detach its duplicates before the ticket is deleted."""
+        orphans = db.query(Ticket, TicketSignature).join(
+            TicketSignature, TicketSignature.ticket_id == Ticket.id
+        ).filter(TicketSignature.parent_ticket_id == ticket_id).all()
+
+        db.query(TicketSignature).filter(
+            TicketSignature.parent_ticket_id == ticket_id
+        ).update({"parent_ticket_id": None, "similarity": None}, synchronize_session=False)
+        db.query(TicketSignature).filter(
+            TicketSignature.ticket_id == ticket_id
+        ).delete(synchronize_session=False)
+
+        with self._lock:
+            self._remove(ticket_id)
+            # Open duplicates become candidate parents again
+            for ticket, row in orphans:
+                if ticket.status not in CLOSED_STATUSES:
+                    self._add(ticket.id, np.frombuffer(row.signature, dtype=np.uint32), ticket.created_at)
+
+    def _resign_if_outdated(self, db: Session):
+        """Recompute stored signatures made with an earlier hash family.
+
+        Stored signatures always match the current ticket text, so one that
+        differs from a fresh MinHash means the hash family changed. Links
+        made with the old signatures are re-checked and dropped when the
+        pair no longer clears the threshold.
+        """
+        sample = db.query(Ticket, TicketSignature).join(
+            TicketSignature, TicketSignature.ticket_id == Ticket.id
+        ).first()
+        if sample is None:
+            return
+        ticket, row = sample
+        if row.signature == minhash(ticket.title, ticket.description).tobytes():
+            return
+
+        rows = db.query(Ticket.id, Ticket.title, Ticket.description, TicketSignature).join(
+            TicketSignature, TicketSignature.ticket_id == Ticket.id
+        ).all()
+        signatures = {}
+        for ticket_id, title, description, row in rows:
+            signatures[ticket_id] = minhash(title, description)
+            row.signature = signatures[ticket_id].tobytes()
+
+        unlinked = 0
+        for ticket_id, _, _, row in rows:
+            if row.parent_ticket_id is None:
+                continue
+            parent = signatures.get(row.parent_ticket_id)
+            score = similarity(signatures[ticket_id], parent) if parent is not None else 0.0
+            if score < settings.DUPLICATE_THRESHOLD:
+                row.parent_ticket_id = None
+                row.similarity = None
+                unlinked += 1
+            else:
+                row.similarity = round(score, 4)
+        db.flush()
+        print(f"Re-signed {len(rows)} ticket signatures; dropped {unlinked} duplicate links")
+
+    def load(self, db: Session) -> int:
+        """Rebuild the index from open parent tickets, signing tickets that have no signature yet."""
+        self._resign_if_outdated(db)
+        rows = db.query(Ticket, TicketSignature).outerjoin(
+            TicketSignature, TicketSignature.ticket_id == Ticket.id
+        ).filter(Ticket.status.notin_(CLOSED_STATUSES)).all()
+
+        with self._lock:
+            self._buckets.clear()
+            self._signatures.clear()
+            self._created_at.clear()
+            for ticket, row in rows:
+                if row is None:
+                    signature = minhash(ticket.title, ticket.description)
+                    db.add(TicketSignature(ticket_id=ticket.id, signature=signature.tobytes()))
+                elif row.parent_ticket_id is None:
+                    signature = np.frombuffer(row.signature, dtype=np.uint32)
+                else:
+                    continue
+                self._add(ticket.id, signature, ticket.created_at)
+        db.commit()
+        return len(self._signatures)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+
+# Global duplicate detector instance
+duplicate_detector = DuplicateDetector()
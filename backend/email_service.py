@@ -1,6 +1,6 @@
 """Email notification service."""
 import asyncio
-from typing import List, Optional
+from typing import Awaitable, Dict, List, Optional
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import aiosmtplib
@@ -344,6 +344,66 @@ Digiskills Support Team
 
         await self.send_email(recipient_email, subject, body, html_body)
 
+    async def send_ticket_digest_notification(
+        self,
+        recipient_email: str,
+        recipient_name: str,
+        subject: str,
+        intro: str,
+        tickets: List[Dict]
+    ):
+        """Send one email summarizing changes to several tickets.
+
+        Each ticket dict has ``ticket_number``, ``ticket_id``, ``title`` and ``detail``.
+        """
+        lines = "\n".join(
+            f"- {ticket['ticket_number']}: {ticket['title']} ({ticket['detail']}) {self._get_ticket_url(ticket['ticket_id'])}"
+            for ticket in tickets
+        )
+        body = f"""
+Hello {recipient_name},
+
+{intro}
+
+{lines}
+
+Best regards,
+Digiskills Support Team
+        """
+
+        rows = "".join(
+            f"""
+        <tr>
+            <td style="padding: 8px;"><a href="{self._get_ticket_url(ticket['ticket_id'])}">{ticket['ticket_number']}</a></td>
+            <td style="padding: 8px;">{ticket['title']}</td>
+            <td style="padding: 8px;">{ticket['detail']}</td>
+        </tr>"""
+            for ticket in tickets
+        )
+        html_body = f"""
+<html>
+<body>
+    <h2>{subject}</h2>
+    <p>Hello {recipient_name},</p>
+    <p>{intro}</p>
+
+    <table style="border-collapse: collapse; margin: 20px 0;">{rows}
+    </table>
+
+    <p>Best regards,<br>Digiskills Support Team</p>
+</body>
+</html>
+        """
+
+        await self.send_email(recipient_email, subject, body, html_body)
+
+    async def send_many(self, notifications: List[Awaitable]):
+        """Send several notifications concurrently, logging failures."""
+        results = await asyncio.gather(*notifications, return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Failed to send notification: {str(result)}")
+
 
 # Global email service instance
 email_service = EmailService()
@@ -0,0 +1,108 @@
+"""In-process event bus pushing ticket and comment changes to connected clients."""
+import asyncio
+import itertools
+import json
+from typing import Dict, Optional, Set
+
+from config import settings
+from models import User, UserRole
+
+
+STAFF_ROLES = (UserRole.ADMIN, UserRole.TECHNICIAN)
+
+
+class Subscription:
+    """A connected client and its queue of pending events."""
+
+    def __init__(self, user: User, max_pending: int):
+        self.user_id = user.id
+        self.role = user.role
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self.overflowed = False
+
+    def can_see(self, event: Dict) -> bool:
+        """Apply the same visibility rules as the ticket and comment endpoints."""
+        if self.role in STAFF_ROLES:
+            return True
+        if event["internal"]:
+            return False
+        return self.user_id in (event["created_by"], event["assigned_to"])
+
+
+class EventBus:
+    """Fans out change events to subscribers allowed to see them.
+
+    Each event is encoded once as a Server-Sent Events frame and queued
+    for every subscriber that may view the ticket: staff see everything,
+    regular users only tickets they created or are assigned to, without
+    internal comments. A subscriber that falls more than ``max_pending``
+    events behind is flagged instead of buffering without bound; its
+    stream then tells the client to re-fetch. Events only reach clients
+    connected to the same worker process.
+    """
+
+    def __init__(self, max_pending: int):
+        self.max_pending = max_pending
+        self._subscriptions: Set[Subscription] = set()
+        self._sequence = itertools.count(1)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def has_subscribers(self) -> bool:
+        """Whether anyone is listening (lets publishers skip building payloads)."""
+        return bool(self._subscriptions)
+
+    def subscribe(self, user: User) -> Subscription:
+        """Register a client stream (called on the event loop)."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(user, self.max_pending)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a client stream."""
+        self._subscriptions.discard(subscription)
+
+    def publish(self, event_type: str, data: Dict, created_by: Optional[int],
+                assigned_to: Optional[int] = None, internal: bool = False):
+        """Queue an event for every subscriber allowed to see it.
+
+        ``created_by`` and ``assigned_to`` are the affected ticket's creator
+        and assignee, used for visibility. Safe to call from worker threads.
+        """
+        if not self._subscriptions or self._loop is None:
+            return
+
+        event_id = next(self._sequence)
+        event = {
+            "frame": f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, default=str)}\n\n",
+            "created_by": created_by,
+            "assigned_to": assigned_to,
+            "internal": internal,
+        }
+
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._dispatch(event)
+        elif not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._dispatch, event)
+
+    def _dispatch(self, event: Dict):
+        """Queue an event for allowed subscribers (runs on the event loop)."""
+        for subscription in list(self._subscriptions):
+            if subscription.overflowed or not subscription.can_see(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event["frame"])
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+
+    def __len__(self) -> int:
+        return len(self._subscriptions)
+
+
+# Global event bus instance
+event_bus = EventBus(max_pending=settings.EVENT_STREAM_MAX_PENDING)
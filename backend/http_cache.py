@@ -0,0 +1,59 @@
+"""HTTP conditional request helpers (ETag / If-None-Match)."""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the parts that identify a resource version."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the request's If-None-Match header matches an ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    # Weak comparison: ignore the W/ prefix on both sides
+    target = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Build a 304 Not Modified response."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+class ConditionalGet:
+    """Dependency answering conditional GETs before a response is built.
+
+    Endpoints pass the cheap version parts of what they would return
+    (ids, ``updated_at`` stamps, counts); if the client's ``If-None-Match``
+    already names that version, ``match`` returns a 304 and the endpoint
+    skips loading and serializing the body. Otherwise the ETag is set on
+    the response that follows.
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.request = request
+        self.response = response
+
+    def match(self, *parts: Any) -> Optional[Response]:
+        """Return a 304 response if the client copy is current, else tag the response."""
+        etag = make_etag(*parts)
+        if etag_matches(self.request, etag):
+            return not_modified(etag)
+        self.response.headers["ETag"] = etag
+        self.response.headers["Cache-Control"] = "private, no-cache"
+        return None
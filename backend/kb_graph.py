@@ -0,0 +1,165 @@
+"""Normalized tag and related-article graph for the knowledge base."""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from models import (
+    KnowledgeBaseArticle, KnowledgeBaseTag,
+    KnowledgeBaseArticleTag, KnowledgeBaseArticleRelation
+)
+
+
+def parse_tags(tags: Optional[str]) -> List[str]:
+    """Parse a comma-separated tag string into unique, normalized tag names."""
+    names = []
+    for tag in (tags or "").split(","):
+        name = tag.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def parse_related_ids(related_articles: Optional[str]) -> List[int]:
+    """Parse a comma-separated article id string into unique ids."""
+    ids = []
+    for value in (related_articles or "").split(","):
+        value = value.strip()
+        if value.isdigit() and int(value) not in ids:
+            ids.append(int(value))
+    return ids
+
+
+def sync_article_tags(db: Session, article: KnowledgeBaseArticle):
+    """Replace an article's tag links with the tags in its ``tags`` string."""
+    names = parse_tags(article.tags)
+
+    db.query(KnowledgeBaseArticleTag).filter(
+        KnowledgeBaseArticleTag.article_id == article.id
+    ).delete(synchronize_session=False)
+
+    if not names:
+        return
+
+    existing = {
+        tag.name: tag
+        for tag in db.query(KnowledgeBaseTag).filter(KnowledgeBaseTag.name.in_(names)).all()
+    }
+    new_tags = [KnowledgeBaseTag(name=name) for name in names if name not in existing]
+    if new_tags:
+        db.add_all(new_tags)
+        db.flush()
+        existing.update({tag.name: tag for tag in new_tags})
+
+    db.add_all([
+        KnowledgeBaseArticleTag(article_id=article.id, tag_id=existing[name].id)
+        for name in names
+    ])
+
+
+def sync_related_articles(db: Session, article: KnowledgeBaseArticle):
+    """Replace an article's related links with the ids in ``related_articles``."""
+    ids = [article_id for article_id in parse_related_ids(article.related_articles) if article_id != article.id]
+
+    db.query(KnowledgeBaseArticleRelation).filter(
+        KnowledgeBaseArticleRelation.article_id == article.id
+    ).delete(synchronize_session=False)
+
+    if not ids:
+        return
+
+    # Skip ids that do not refer to an existing article
+    valid_ids = {
+        row.id for row in db.query(KnowledgeBaseArticle.id).filter(KnowledgeBaseArticle.id.in_(ids)).all()
+    }
+    db.add_all([
+        KnowledgeBaseArticleRelation(article_id=article.id, related_article_id=related_id, position=position)
+        for position, related_id in enumerate(ids)
+        if related_id in valid_ids
+    ])
+
+
+def sync_article(db: Session, article: KnowledgeBaseArticle):
+    """Sync an article's normalized tag and relation rows."""
+    sync_article_tags(db, article)
+    sync_related_articles(db, article)
+
+
+def remove_article(db: Session, article_id: int):
+    """Delete all tag and relation rows that reference an article."""
+    db.query(KnowledgeBaseArticleTag).filter(
+        KnowledgeBaseArticleTag.article_id == article_id
+    ).delete(synchronize_session=False)
+    db.query(KnowledgeBaseArticleRelation).filter(
+        or_(
+            KnowledgeBaseArticleRelation.article_id == article_id,
+            KnowledgeBaseArticleRelation.related_article_id == article_id
+        )
+    ).delete(synchronize_session=False)
+
+
+def rebuild(db: Session) -> int:
+    """Populate the tag and relation tables from existing articles if they are empty."""
+    if db.query(KnowledgeBaseArticleTag).first() or db.query(KnowledgeBaseArticleRelation).first():
+        return 0
+
+    articles = db.query(KnowledgeBaseArticle).filter(
+        or_(KnowledgeBaseArticle.tags != None, KnowledgeBaseArticle.related_articles != None)
+    ).all()
+    for article in articles:
+        sync_article(db, article)
+    db.commit()
+    return len(articles)
+
+
+def filter_by_tag(query, tag: str):
+    """Restrict an article query to articles carrying a tag."""
+    return query.join(
+        KnowledgeBaseArticleTag, KnowledgeBaseArticleTag.article_id == KnowledgeBaseArticle.id
+    ).join(
+        KnowledgeBaseTag, KnowledgeBaseTag.id == KnowledgeBaseArticleTag.tag_id
+    ).filter(KnowledgeBaseTag.name == tag.strip().lower())
+
+
+def get_tag_counts(db: Session, published_only: bool = True, limit: int = 100):
+    """Return (tag name, article count) pairs, most used first."""
+    article_count = func.count(KnowledgeBaseArticleTag.article_id)
+    query = db.query(KnowledgeBaseTag.name, article_count).join(
+        KnowledgeBaseArticleTag, KnowledgeBaseArticleTag.tag_id == KnowledgeBaseTag.id
+    )
+
+    if published_only:
+        query = query.join(
+            KnowledgeBaseArticle, KnowledgeBaseArticle.id == KnowledgeBaseArticleTag.article_id
+        ).filter(KnowledgeBaseArticle.is_published == True)
+
+    return query.group_by(KnowledgeBaseTag.name).order_by(
+        article_count.desc(), KnowledgeBaseTag.name
+    ).limit(limit).all()
+
+
+def get_related_articles(
+    db: Session,
+    article_ids: Iterable[int],
+    published_only: bool = True
+) -> Dict[int, List[KnowledgeBaseArticle]]:
+    """Resolve related articles for many articles in a single query."""
+    article_ids = list(article_ids)
+    related: Dict[int, List[KnowledgeBaseArticle]] = defaultdict(list)
+    if not article_ids:
+        return related
+
+    query = db.query(KnowledgeBaseArticleRelation.article_id, KnowledgeBaseArticle).join(
+        KnowledgeBaseArticle, KnowledgeBaseArticle.id == KnowledgeBaseArticleRelation.related_article_id
+    ).filter(KnowledgeBaseArticleRelation.article_id.in_(article_ids))
+
+    if published_only:
+        query = query.filter(KnowledgeBaseArticle.is_published == True)
+
+    rows = query.order_by(
+        KnowledgeBaseArticleRelation.article_id, KnowledgeBaseArticleRelation.position
+    ).all()
+    for article_id, related_article in rows:
+        related[article_id].append(related_article)
+    return related
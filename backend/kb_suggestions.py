@@ -0,0 +1,185 @@
+"""Knowledge base article suggestions for ticket content."""
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import KnowledgeBaseArticle
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9\-']*[a-z0-9]|[a-z0-9]")
+
+STOP_WORDS = frozenset("""
+a an and are as at be but by can cannot could do does for from has have how i if in into is it its
+me my no not of on or our please so that the their then there these this to too was we were what
+when where which while who why will with would you your hi hello thanks thank regards
+""".split())
+
+# Field -> repeat count used to boost terms from that field
+FIELD_WEIGHTS = {
+    "title": 3,
+    "tags": 2,
+    "summary": 1,
+    "content": 1,
+}
+
+# Recompute all document norms when the corpus size drifts by this fraction
+NORM_REFRESH_DRIFT = 0.1
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase terms without stop words."""
+    if not text:
+        return []
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class KBSuggestionEngine:
+    """Sparse TF-IDF similarity index over published knowledge base articles.
+
+    Each article is stored as log-scaled term frequencies in an inverted
+    index. A query only visits the postings of its own terms, so lookups
+    take time proportional to the matching postings rather than the
+    number of articles.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_norms: Dict[int, float] = {}
+        self._doc_info: Dict[int, Dict] = {}
+        self._norm_corpus_size = 0
+        self._lock = threading.RLock()
+
+    def _idf(self, term: str) -> float:
+        """Smoothed inverse document frequency."""
+        df = len(self._postings.get(term, ()))
+        return math.log((1 + len(self._doc_terms)) / (1 + df)) + 1.0
+
+    def _norm(self, terms: Dict[str, float]) -> float:
+        """L2 norm of a TF-IDF vector."""
+        return math.sqrt(sum((tf * self._idf(term)) ** 2 for term, tf in terms.items())) or 1.0
+
+    def _refresh_norms(self):
+        """Recompute document norms after the IDF statistics have drifted."""
+        size = len(self._doc_terms)
+        if abs(size - self._norm_corpus_size) <= max(1, self._norm_corpus_size * NORM_REFRESH_DRIFT):
+            return
+        for doc_id, terms in self._doc_terms.items():
+            self._doc_norms[doc_id] = self._norm(terms)
+        self._norm_corpus_size = size
+
+    @staticmethod
+    def _vectorize(fields: Dict[str, Optional[str]]) -> Dict[str, float]:
+        """Build log-scaled, field-weighted term frequencies."""
+        counts: Counter = Counter()
+        for field, text in fields.items():
+            weight = FIELD_WEIGHTS.get(field, 1)
+            for token in tokenize(text):
+                counts[token] += weight
+        return {term: 1.0 + math.log(count) for term, count in counts.items()}
+
+    def upsert(self, article: KnowledgeBaseArticle):
+        """Index an article, or drop it if it is no longer published."""
+        if not article.is_published:
+            self.remove(article.id)
+            return
+
+        terms = self._vectorize({
+            "title": article.title,
+            "tags": (article.tags or "").replace(",", " "),
+            "summary": article.summary,
+            "content": article.content,
+        })
+
+        with self._lock:
+            self._remove_postings(article.id)
+            for term, tf in terms.items():
+                self._postings[term][article.id] = tf
+            self._doc_terms[article.id] = terms
+            self._doc_norms[article.id] = self._norm(terms)
+            self._doc_info[article.id] = {
+                "id": article.id,
+                "title": article.title,
+                "slug": article.slug,
+                "summary": article.summary,
+            }
+            self._refresh_norms()
+
+    def _remove_postings(self, article_id: int):
+        """Remove an article's postings (caller holds the lock)."""
+        for term in self._doc_terms.pop(article_id, {}):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(article_id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def remove(self, article_id: int):
+        """Remove an article from the index."""
+        with self._lock:
+            self._remove_postings(article_id)
+            self._doc_norms.pop(article_id, None)
+            self._doc_info.pop(article_id, None)
+            self._refresh_norms()
+
+    def load(self, db: Session) -> int:
+        """Rebuild the index from all published articles."""
+        articles = db.query(KnowledgeBaseArticle).filter(KnowledgeBaseArticle.is_published == True).all()
+        with self._lock:
+            self._postings.clear()
+            self._doc_terms.clear()
+            self._doc_norms.clear()
+            self._doc_info.clear()
+            self._norm_corpus_size = 0
+            for article in articles:
+                self.upsert(article)
+            self._refresh_norms()
+        return len(articles)
+
+    def suggest(
+        self,
+        title: str,
+        description: str,
+        limit: Optional[int] = None,
+        min_score: Optional[float] = None
+    ) -> List[Dict]:
+        """Return the articles most similar to ticket content, best first."""
+        limit = limit or settings.KB_SUGGESTION_LIMIT
+        min_score = settings.KB_SUGGESTION_MIN_SCORE if min_score is None else min_score
+        query = self._vectorize({"title": title, "content": description})
+
+        with self._lock:
+            scores: Dict[int, float] = defaultdict(float)
+            query_weights = {term: tf * self._idf(term) for term, tf in query.items()}
+            for term, weight in query_weights.items():
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = self._idf(term)
+                for doc_id, doc_tf in postings.items():
+                    scores[doc_id] += weight * doc_tf * idf
+
+            if not scores:
+                return []
+
+            query_norm = math.sqrt(sum(weight ** 2 for weight in query_weights.values())) or 1.0
+            top = heapq.nlargest(
+                limit,
+                ((score / (query_norm * self._doc_norms[doc_id]), doc_id) for doc_id, score in scores.items())
+            )
+
+            return [
+                {**self._doc_info[doc_id], "score": round(score, 4)}
+                for score, doc_id in top
+                if score >= min_score
+            ]
+
+
+# Global knowledge base suggestion engine instance
+kb_suggestion_engine = KBSuggestionEngine()
@@ -0,0 +1,99 @@
+"""Single-pass multi-pattern keyword matcher."""
+import re
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+
+# Hits for one text: group -> label -> matched keywords
+KeywordHits = Dict[str, Dict[Hashable, Set[str]]]
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens (hyphenated words stay whole)."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def stem(token: str) -> str:
+    """Reduce a word to a light stem by stripping common inflections.
+
+    Plural (-ies, -es, -s) and verb (-ed, -ing) endings are removed, then a
+    final "e" and a doubled final consonant, so "update", "updates" and
+    "updated" all become "updat". Stems are never shorter than three letters.
+    Keywords and text go through the same function, so stems only need to
+    agree with each other, not be real words.
+    """
+    if len(token) <= 3 or not token.isalpha():
+        return token
+
+    if token.endswith(("ies", "ied")) and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith("es") and len(token) - 2 >= 3:
+        token = token[:-2]
+    elif token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        token = token[:-1]
+
+    for suffix in ("ing", "ed"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            token = token[:-len(suffix)]
+            break
+
+    if token.endswith("e") and len(token) > 3:
+        token = token[:-1]
+    if len(token) > 3 and token[-1] == token[-2] and token[-1] not in "lsz" and token[-1] not in "aeiou":
+        token = token[:-1]
+    return token
+
+
+class KeywordMatcher:
+    """Matches many keyword lists against a text in a single scan.
+
+    Keywords are compiled once into a lookup table keyed by their token
+    sequence. Matching tokenizes the text once, resolves single-word
+    keywords with a set intersection and multi-word keywords by looking up
+    n-grams that start with a known first word. Keywords match whole words
+    after light stemming, so "crash" matches "crashes", "crashed" and
+    "crashing" while "ip" no longer matches "zip".
+    """
+
+    def __init__(self, groups: Dict[str, Dict[Hashable, Iterable[str]]]):
+        # keyword -> [(group, label)]
+        self._targets: Dict[str, List[Tuple[str, Hashable]]] = defaultdict(list)
+        self._single_words: Set[str] = set()
+        # first word -> phrase lengths starting with that word
+        self._phrase_starts: Dict[str, Set[int]] = defaultdict(set)
+        self._groups = list(groups)
+
+        for group, labels in groups.items():
+            for label, keywords in labels.items():
+                for keyword in keywords:
+                    tokens = [stem(token) for token in tokenize(keyword)]
+                    if not tokens:
+                        continue
+                    normalized = " ".join(tokens)
+                    self._targets[normalized].append((group, label))
+                    if len(tokens) == 1:
+                        self._single_words.add(normalized)
+                    else:
+                        self._phrase_starts[tokens[0]].add(len(tokens))
+
+    def match(self, text: str) -> KeywordHits:
+        """Return every keyword found in the text, grouped by group and label."""
+        tokens = [stem(token) for token in tokenize(text)]
+
+        found = self._single_words.intersection(tokens)
+        for index, token in enumerate(tokens):
+            lengths = self._phrase_starts.get(token)
+            if not lengths:
+                continue
+            for length in lengths:
+                phrase = " ".join(tokens[index:index + length])
+                if phrase in self._targets:
+                    found.add(phrase)
+
+        hits: KeywordHits = {group: defaultdict(set) for group in self._groups}
+        for keyword in found:
+            for group, label in self._targets[keyword]:
+                hits[group][label].add(keyword)
+        return hits
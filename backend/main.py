@@ -8,10 +8,23 @@ from sqlalchemy.orm import Session
 from config import settings
 from database import engine, init_db, SessionLocal
 from models import User, Category, UserRole, SLAPolicy, SLAPriority, KnowledgeBaseCategory
-from auth import get_password_hash
+from auth import get_password_hash, prune_used_refresh_tokens
+from password_hashing import password_hasher
+from token_versions import token_versions
+from sla_registry import sla_registry
+from sla_at_risk import sla_at_risk_index
+import ticket_changes
+from preview_service import preview_service
+from search_index import ticket_search_index, kb_search_index
+from counter_service import kb_counter_buffer
+import kb_graph
+from kb_suggestions import kb_suggestion_engine
+from ticket_classifier import ticket_classifier
+from duplicate_detector import duplicate_detector
+from ai_categorization import ai_service
 from routers import (
     auth, users, tickets, categories, comments,
-    templates, sla, attachments, knowledge_base, webhooks, analytics, ai
+    templates, sla, attachments, knowledge_base, webhooks, analytics, ai, events
 )
 
 
@@ -25,6 +38,11 @@ async def lifespan(app: FastAPI):
     print("📊 Initializing database...")
     init_db()
 
+    # Initialize full-text search indexes
+    print("🔍 Initializing search indexes...")
+    ticket_search_index.setup(engine)
+    kb_search_index.setup(engine)
+
     # Create default data
     db = SessionLocal()
     try:
@@ -133,12 +151,46 @@ async def lifespan(app: FastAPI):
             db.commit()
             print("✅ Default KB categories created")
 
+        # Populate normalized KB tags and related-article links
+        indexed = kb_graph.rebuild(db)
+        if indexed:
+            print(f"🏷️  Indexed tags and related articles for {indexed} KB articles")
+
+        # Build the KB similarity index used for ticket suggestions
+        kb_suggestion_engine.load(db)
+
+        # Load the trained ticket classifier, if one has been trained
+        if ticket_classifier.load():
+            print(f"🧠 Loaded ticket classifier ({ticket_classifier.version})")
+
+        # Index open tickets for near-duplicate detection
+        duplicate_detector.load(db)
+
+        # Load token revocations
+        token_versions.load(db)
+
+        # Load active SLA policies used when tickets are created
+        sla_registry.load(db, force=True)
+
+        # Queue open tickets by their next SLA deadline
+        sla_at_risk_index.load(db)
+
+        # Drop ticket changes past the delta sync retention period
+        ticket_changes.prune(db)
+
+        # Forget used refresh tokens that have expired
+        prune_used_refresh_tokens(db)
+
         # Create upload directory
         os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
 
     finally:
         db.close()
 
+    # Start flushing buffered KB article counters
+    kb_counter_buffer.start()
+    sla_at_risk_index.start()
+
     print(f"✨ {settings.APP_NAME} v{settings.APP_VERSION} is ready!")
     print(f"🌐 Environment: {settings.ENVIRONMENT}")
     print(f"📝 API Documentation: http://{settings.HOST}:{settings.PORT}/docs")
@@ -149,6 +201,11 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     print("👋 Shutting down...")
+    await kb_counter_buffer.stop()
+    await sla_at_risk_index.stop()
+    preview_service.shutdown()
+    ai_service.shutdown()
+    password_hasher.shutdown()
 
 
 # Create FastAPI application
@@ -182,6 +239,7 @@ app.include_router(knowledge_base.router)
 app.include_router(webhooks.router)
 app.include_router(analytics.router)
 app.include_router(ai.router)
+app.include_router(events.router)
 
 
 @app.get("/")
@@ -1,5 +1,8 @@
 """SQLAlchemy database models."""
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Float
+from sqlalchemy import (
+    Column, Integer, String, Text, Boolean, DateTime, Date, Time, ForeignKey, Enum, Float, LargeBinary,
+    UniqueConstraint
+)
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -60,6 +63,24 @@ class User(Base):
     attachments = relationship("TicketAttachment", back_populates="uploader")
 
 
+class UserTokenVersion(Base):
+    """Current token version of a user; tokens carrying an older version are revoked."""
+    __tablename__ = "user_token_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+
+class UsedRefreshToken(Base):
+    """Refresh token (by ``jti``) that was already exchanged; each one works only once."""
+    __tablename__ = "used_refresh_tokens"
+
+    jti = Column(String(32), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    used_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
 class Category(Base):
     """Category model for ticket categorization."""
     __tablename__ = "categories"
@@ -110,6 +131,66 @@ class SLAPolicy(Base):
 
     # Relationships
     tickets = relationship("Ticket", back_populates="sla_policy")
+    calendar_link = relationship(
+        "SLAPolicyCalendar", uselist=False, lazy="joined", cascade="all, delete-orphan"
+    )
+
+    @property
+    def calendar_id(self):
+        """Business calendar the policy's hours are counted in (None for wall-clock hours)."""
+        return self.calendar_link.calendar_id if self.calendar_link else None
+
+    @calendar_id.setter
+    def calendar_id(self, value):
+        if value is None:
+            self.calendar_link = None
+        elif self.calendar_link is None:
+            self.calendar_link = SLAPolicyCalendar(calendar_id=value)
+        else:
+            self.calendar_link.calendar_id = value
+
+
+class BusinessCalendar(Base):
+    """Weekly working hours and holidays that SLA time is counted in."""
+    __tablename__ = "business_calendars"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)
+    description = Column(Text)
+    timezone = Column(String(64), default="UTC", nullable=False)  # IANA name, e.g. Europe/Berlin
+    work_days = Column(String(20), default="0,1,2,3,4", nullable=False)  # Weekdays, Monday = 0
+    work_start = Column(Time, nullable=False)
+    work_end = Column(Time, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    # Relationships
+    holidays = relationship(
+        "BusinessHoliday", back_populates="calendar", cascade="all, delete-orphan",
+        order_by="BusinessHoliday.date"
+    )
+
+
+class BusinessHoliday(Base):
+    """Non-working day of a business calendar."""
+    __tablename__ = "business_holidays"
+    __table_args__ = (UniqueConstraint("calendar_id", "date"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    calendar_id = Column(Integer, ForeignKey("business_calendars.id", ondelete="CASCADE"), nullable=False, index=True)
+    date = Column(Date, nullable=False)
+    name = Column(String(100))
+
+    # Relationships
+    calendar = relationship("BusinessCalendar", back_populates="holidays")
+
+
+class SLAPolicyCalendar(Base):
+    """Business calendar assigned to an SLA policy."""
+    __tablename__ = "sla_policy_calendars"
+
+    sla_policy_id = Column(Integer, ForeignKey("sla_policies.id", ondelete="CASCADE"), primary_key=True)
+    calendar_id = Column(Integer, ForeignKey("business_calendars.id"), nullable=False, index=True)
 
 
 class Ticket(Base):
@@ -183,6 +264,34 @@ class TicketAttachment(Base):
     uploader = relationship("User", back_populates="attachments")
 
 
+class TicketSignature(Base):
+    """MinHash signature of a ticket's text and its near-duplicate parent link."""
+    __tablename__ = "ticket_signatures"
+
+    ticket_id = Column(Integer, ForeignKey("tickets.id", ondelete="CASCADE"), primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+    parent_ticket_id = Column(Integer, ForeignKey("tickets.id", ondelete="SET NULL"), nullable=True, index=True)
+    similarity = Column(Float, nullable=True)  # Estimated Jaccard similarity to the parent
+
+
+class TicketChange(Base):
+    """Entry in the append-only ticket change log used for delta sync.
+
+    No foreign key to tickets: deletions stay in the log as tombstones. The
+    creator and assignee at the time of the change decide who may see it.
+    """
+    __tablename__ = "ticket_changes"
+    # AUTOINCREMENT keeps SQLite from reusing sequence numbers after pruning
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    seq = Column(Integer, primary_key=True)
+    ticket_id = Column(Integer, nullable=False, index=True)
+    change_type = Column(String(10), nullable=False)  # created, updated or deleted
+    created_by = Column(Integer, nullable=True)
+    assigned_to = Column(Integer, nullable=True)
+    changed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
+
+
 # Phase 3: Knowledge Base Models
 
 class KnowledgeBaseCategory(Base):
@@ -232,6 +341,33 @@ class KnowledgeBaseArticle(Base):
     author = relationship("User")
 
 
+class KnowledgeBaseTag(Base):
+    """Normalized knowledge base tag."""
+    __tablename__ = "kb_tags"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False, index=True)
+
+
+class KnowledgeBaseArticleTag(Base):
+    """Association between knowledge base articles and tags."""
+    __tablename__ = "kb_article_tags"
+
+    article_id = Column(Integer, ForeignKey("kb_articles.id", ondelete="CASCADE"), primary_key=True)
+    tag_id = Column(Integer, ForeignKey("kb_tags.id", ondelete="CASCADE"), primary_key=True, index=True)
+
+
+class KnowledgeBaseArticleRelation(Base):
+    """Directed "related article" link between knowledge base articles."""
+    __tablename__ = "kb_article_relations"
+
+    article_id = Column(Integer, ForeignKey("kb_articles.id", ondelete="CASCADE"), primary_key=True)
+    related_article_id = Column(
+        Integer, ForeignKey("kb_articles.id", ondelete="CASCADE"), primary_key=True, index=True
+    )
+    position = Column(Integer, default=0, nullable=False)  # Order given by the author
+
+
 # Phase 3: Integration Models
 
 class WebhookEventType(str, enum.Enum):
@@ -0,0 +1,149 @@
+"""Thumbnail and preview generation service for attachments."""
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Set
+
+from config import settings
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+try:
+    import pypdfium2 as pdfium
+except ImportError:  # pragma: no cover - optional dependency
+    pdfium = None
+
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "gif"}
+PDF_EXTENSIONS = {"pdf"}
+
+# Derivative name -> setting holding its bounding box size in pixels
+DERIVATIVES = {
+    "thumbnail": "THUMBNAIL_SIZE",
+    "preview": "PREVIEW_SIZE",
+}
+
+
+def derivative_path(file_path: str, kind: str) -> str:
+    """Return the path of a derivative stored alongside the original blob."""
+    return f"{os.path.splitext(file_path)[0]}.{kind}.jpg"
+
+
+def _render_source(file_path: str, file_ext: str, max_size: int):
+    """Load the first frame/page of an attachment as a PIL image."""
+    if file_ext in PDF_EXTENSIONS:
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            page = pdf[0]
+            width, height = page.get_size()
+            scale = max_size / max(width, height, 1)
+            return page.render(scale=max(scale, 0.1)).to_pil()
+        finally:
+            pdf.close()
+
+    image = Image.open(file_path)
+    image.seek(0)  # First frame of animated GIFs
+    return image
+
+
+def generate_derivatives(file_path: str, file_ext: str, sizes: Dict[str, int]) -> Dict[str, str]:
+    """Generate JPEG derivatives for a file (runs inside a worker process)."""
+    largest = max(sizes.values())
+    source = _render_source(file_path, file_ext, largest)
+    source = source.convert("RGB")
+
+    generated = {}
+    # Build the largest derivative first so smaller ones downscale from it
+    for kind, size in sorted(sizes.items(), key=lambda item: -item[1]):
+        output_path = derivative_path(file_path, kind)
+        derivative = source.copy()
+        derivative.thumbnail((size, size))
+        tmp_path = f"{output_path}.tmp"
+        derivative.save(tmp_path, "JPEG", quality=80, optimize=True)
+        os.replace(tmp_path, output_path)
+        generated[kind] = output_path
+
+    return generated
+
+
+class PreviewService:
+    """Service for generating attachment thumbnails and previews in the background."""
+
+    def __init__(self):
+        self.enabled = settings.PREVIEW_ENABLED
+        self.max_workers = settings.PREVIEW_WORKERS
+        self.sizes = {kind: getattr(settings, name) for kind, name in DERIVATIVES.items()}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Set[str] = set()
+        self._failed: Set[str] = set()
+
+    def supports(self, file_ext: str) -> bool:
+        """Check whether derivatives can be generated for a file type."""
+        if not self.enabled:
+            return False
+        if file_ext in IMAGE_EXTENSIONS:
+            return Image is not None
+        if file_ext in PDF_EXTENSIONS:
+            return Image is not None and pdfium is not None
+        return False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def schedule(self, file_path: str) -> bool:
+        """Queue derivative generation for an uploaded file."""
+        file_ext = os.path.splitext(file_path)[1][1:].lower()
+        if not self.supports(file_ext) or file_path in self._failed:
+            return False
+        if file_path in self._pending:
+            return True
+
+        self._pending.add(file_path)
+        asyncio.create_task(self._generate(file_path, file_ext))
+        return True
+
+    async def _generate(self, file_path: str, file_ext: str):
+        """Run derivative generation in the process pool."""
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                self._get_executor(), generate_derivatives, file_path, file_ext, self.sizes
+            )
+        except Exception as e:
+            print(f"Failed to generate preview for {file_path}: {str(e)}")
+            # Not retried on every request; a restart clears this
+            self._failed.add(file_path)
+        finally:
+            self._pending.discard(file_path)
+
+    def is_pending(self, file_path: str) -> bool:
+        """Check whether derivatives for a file are still being generated."""
+        return file_path in self._pending
+
+    def get_derivative(self, file_path: str, kind: str) -> Optional[str]:
+        """Return the derivative path if it has been generated."""
+        path = derivative_path(file_path, kind)
+        return path if os.path.exists(path) else None
+
+    def delete_derivatives(self, file_path: str):
+        """Remove all derivatives stored for a file."""
+        for kind in DERIVATIVES:
+            path = derivative_path(file_path, kind)
+            if os.path.exists(path):
+                os.remove(path)
+
+    def shutdown(self):
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global preview service instance
+preview_service = PreviewService()
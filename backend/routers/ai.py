@@ -1,12 +1,18 @@
 """AI-powered features API routes."""
-from fastapi import APIRouter, Depends, Body
+from fastapi import APIRouter, Depends, Body, HTTPException, status
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from database import get_db
 from models import User
-from schemas import AIAnalysisRequest, AIAnalysisResponse
-from auth import get_current_user
+from schemas import (
+    AIAnalysisRequest, AIAnalysisResponse,
+    AIBatchAnalysisRequest, AIBatchAnalysisResponse
+)
+from auth import get_current_user, require_admin
 from ai_categorization import ai_service
+from kb_suggestions import kb_suggestion_engine
+from config import settings
 
 router = APIRouter(prefix="/api/ai", tags=["AI Features"])
 
@@ -23,10 +29,40 @@ async def analyze_ticket_content(
         description=request.description,
         db=db
     )
+    analysis["suggested_articles"] = kb_suggestion_engine.suggest(request.title, request.description)
 
     return AIAnalysisResponse(**analysis)
 
 
+@router.post("/analyze/batch", response_model=AIBatchAnalysisResponse)
+async def analyze_ticket_batch(
+    request: AIBatchAnalysisRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Analyze many tickets at once; results are returned in request order."""
+    if len(request.items) > settings.AI_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Batch too large. Maximum is {settings.AI_BATCH_MAX_ITEMS} items"
+        )
+
+    items = [(item.title, item.description) for item in request.items]
+
+    def analyze():
+        analyses = ai_service.analyze_batch(items, db)
+        results = []
+        for (title, description), analysis in zip(items, analyses):
+            analysis["suggested_articles"] = kb_suggestion_engine.suggest(title, description)
+            results.append(AIAnalysisResponse(**analysis))
+        return results
+
+    # Matching a large batch waits on worker processes; keep the event loop free
+    results = await run_in_threadpool(analyze)
+
+    return AIBatchAnalysisResponse(results=results)
+
+
 @router.post("/suggest-category")
 async def suggest_category(
     title: str = Body(...),
@@ -55,3 +91,11 @@ async def suggest_priority(
     return {
         "suggested_priority": priority.value
     }
+
+
+@router.get("/cache-stats")
+async def get_analysis_cache_stats(
+    current_user: User = Depends(require_admin)
+):
+    """Get hit/miss statistics for memoized ticket analyses (admin only)."""
+    return ai_service.analysis_cache.stats()
@@ -1,9 +1,10 @@
 """File attachment API routes."""
 import os
 import uuid
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from fastapi.responses import FileResponse
+from typing import List, Literal
+from urllib.parse import quote
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Request
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
 from database import get_db
@@ -11,6 +12,8 @@ from models import User, Ticket, TicketAttachment, UserRole
 from schemas import AttachmentResponse
 from auth import get_current_user
 from config import settings
+from preview_service import preview_service
+from compression import write_blob, get_file_encoding, iter_decompressed, accepts_encoding
 
 router = APIRouter(prefix="/api/attachments", tags=["Attachments"])
 
@@ -48,13 +51,20 @@ def save_upload_file(upload_file: UploadFile, ticket_id: int) -> tuple[str, str]
     unique_filename = f"{uuid.uuid4()}{file_ext}"
     file_path = os.path.join(ticket_dir, unique_filename)
 
-    # Save file
-    with open(file_path, "wb") as buffer:
-        buffer.write(upload_file.file.read())
+    # Save file, compressing compressible types at rest
+    file_path = write_blob(upload_file.file, file_path, upload_file.content_type)
 
     return file_path, upload_file.filename
 
 
+def content_disposition(filename: str) -> str:
+    """Build a Content-Disposition header for a download."""
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+
 @router.post("/ticket/{ticket_id}", response_model=AttachmentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_attachment(
     ticket_id: int,
@@ -85,8 +95,8 @@ async def upload_attachment(
     # Save file
     file_path, original_filename = save_upload_file(file, ticket_id)
 
-    # Get file size
-    file_size = os.path.getsize(file_path)
+    # Get original (uncompressed) file size
+    file_size = file.file.tell()
 
     # Create attachment record
     attachment = TicketAttachment(
@@ -102,6 +112,9 @@ async def upload_attachment(
     db.commit()
     db.refresh(attachment)
 
+    # Generate thumbnail and preview in the background
+    preview_service.schedule(file_path)
+
     return attachment
 
 
@@ -135,6 +148,7 @@ async def list_ticket_attachments(
 @router.get("/{attachment_id}/download")
 async def download_attachment(
     attachment_id: int,
+    request: Request,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -163,10 +177,77 @@ async def download_attachment(
             detail="File not found on server"
         )
 
-    return FileResponse(
-        path=attachment.file_path,
-        filename=attachment.file_name,
-        media_type=attachment.mime_type
+    encoding = get_file_encoding(attachment.file_path)
+    if not encoding:
+        return FileResponse(
+            path=attachment.file_path,
+            filename=attachment.file_name,
+            media_type=attachment.mime_type
+        )
+
+    # Serve the compressed blob as-is when the client can decode it
+    if accepts_encoding(request.headers.get("accept-encoding"), encoding):
+        return FileResponse(
+            path=attachment.file_path,
+            filename=attachment.file_name,
+            media_type=attachment.mime_type,
+            headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+        )
+
+    return StreamingResponse(
+        iter_decompressed(attachment.file_path),
+        media_type=attachment.mime_type,
+        headers={
+            "Content-Disposition": content_disposition(attachment.file_name),
+            "Vary": "Accept-Encoding"
+        }
+    )
+
+
+@router.get("/{attachment_id}/preview")
+async def get_attachment_preview(
+    attachment_id: int,
+    size: Literal["thumbnail", "preview"] = "thumbnail",
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get a thumbnail or first-page preview of an image/PDF attachment."""
+    attachment = db.query(TicketAttachment).filter(TicketAttachment.id == attachment_id).first()
+
+    if not attachment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attachment not found"
+        )
+
+    # Check if user has access to the ticket
+    ticket = attachment.ticket
+    if current_user.role == UserRole.USER:
+        if ticket.created_by != current_user.id and ticket.assigned_to != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to view this attachment"
+            )
+
+    preview_path = preview_service.get_derivative(attachment.file_path, size)
+    if preview_path:
+        return FileResponse(
+            path=preview_path,
+            media_type="image/jpeg",
+            headers={"Cache-Control": "private, max-age=86400"}
+        )
+
+    # Still being generated, or missing (uploaded before previews existed or
+    # interrupted by a restart) and queued now
+    if preview_service.schedule(attachment.file_path):
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content={"detail": "Preview is being generated"}
+        )
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Preview not available for this attachment"
     )
 
 
@@ -195,6 +276,7 @@ async def delete_attachment(
     # Delete file from filesystem
     if os.path.exists(attachment.file_path):
         os.remove(attachment.file_path)
+    preview_service.delete_derivatives(attachment.file_path)
 
     db.delete(attachment)
     db.commit()
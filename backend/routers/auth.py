@@ -1,17 +1,23 @@
 """Authentication API routes."""
+from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from database import get_db
 from models import User
-from schemas import LoginRequest, Token, UserCreate, UserResponse
-from auth import authenticate_user, create_access_token, get_password_hash
+from schemas import LoginRequest, Token, UserCreate, UserResponse, RefreshTokenRequest
+from auth import (
+    authenticate_user, issue_tokens, decode_token, revoke_tokens, get_current_user, consume_refresh_token
+)
+from config import settings
+from token_versions import token_versions
+from password_hashing import password_hasher
 
 router = APIRouter(prefix="/api/auth", tags=["Authentication"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user."""
     # Check if username already exists
     if db.query(User).filter(User.username == user_data.username).first():
@@ -31,7 +37,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     user = User(
         username=user_data.username,
         email=user_data.email,
-        password_hash=get_password_hash(user_data.password),
+        password_hash=await password_hasher.hash(user_data.password),
         first_name=user_data.first_name,
         last_name=user_data.last_name,
         role=user_data.role,
@@ -46,9 +52,9 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login", response_model=Token)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+async def login(login_data: LoginRequest, db: Session = Depends(get_db)):
     """Authenticate user and return JWT token."""
-    user = authenticate_user(db, login_data.username, login_data.password)
+    user = await authenticate_user(db, login_data.username, login_data.password)
 
     if not user:
         raise HTTPException(
@@ -57,8 +63,44 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    access_token = create_access_token(
-        data={"sub": user.id, "username": user.username, "role": user.role.value}
-    )
+    return issue_tokens(user)
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+    """Exchange a refresh token for a new access/refresh token pair."""
+    token_data = decode_token(request.refresh_token, token_type="refresh")
+
+    # Refreshing is rare, so check revocation and account status against the database
+    token_version = token_versions.stored_version(db, token_data.user_id)
+    user = db.query(User).filter(User.id == token_data.user_id).first()
+
+    if not user or not user.is_active or token_data.token_version != token_version or not token_data.token_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or revoked refresh token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    # Each refresh token works once; the response carries its replacement
+    used_at = consume_refresh_token(db, token_data)
+    if used_at is not None:
+        # Concurrent refreshes (several tabs) are expected; a late replay means the token leaked
+        if datetime.utcnow() - used_at > timedelta(seconds=settings.REFRESH_TOKEN_REUSE_GRACE_SECONDS):
+            revoke_tokens(db, user.id)
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token already used",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return issue_tokens(user, token_version)
+
 
-    return {"access_token": access_token, "token_type": "bearer"}
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Sign out everywhere by revoking all of the user's tokens."""
+    revoke_tokens(db, current_user.id)
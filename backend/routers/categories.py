@@ -7,6 +7,8 @@ from database import get_db
 from models import User, Category
 from schemas import CategoryCreate, CategoryResponse
 from auth import require_technician
+from category_directory import category_directory
+from http_cache import ConditionalGet
 
 router = APIRouter(prefix="/api/categories", tags=["Categories"])
 
@@ -45,6 +47,8 @@ async def create_category(
     db.commit()
     db.refresh(category)
 
+    category_directory.invalidate()
+
     return category
 
 
@@ -52,11 +56,16 @@ async def create_category(
 async def list_categories(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    conditional: ConditionalGet = Depends()
 ):
-    """List all categories."""
-    categories = db.query(Category).offset(skip).limit(limit).all()
-    return categories
+    """List all categories (supports If-None-Match)."""
+    not_modified = conditional.match(category_directory.etag(db), skip, limit)
+    if not_modified:
+        return not_modified
+
+    categories = category_directory.all(db)
+    return categories[skip:skip + limit]
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
@@ -65,7 +74,7 @@ async def get_category(
     db: Session = Depends(get_db)
 ):
     """Get category by ID."""
-    category = db.query(Category).filter(Category.id == category_id).first()
+    category = category_directory.get(db, category_id)
 
     if not category:
         raise HTTPException(
@@ -93,3 +102,5 @@ async def delete_category(
 
     db.delete(category)
     db.commit()
+
+    category_directory.invalidate()
@@ -2,6 +2,7 @@
 from typing import List
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from database import get_db
@@ -9,6 +10,10 @@ from models import User, Ticket, TicketComment, UserRole
 from schemas import CommentCreate, CommentResponse
 from auth import get_current_user
 from email_service import email_service
+from sla_at_risk import sla_at_risk_index
+from event_bus import event_bus
+import ticket_changes
+from http_cache import ConditionalGet
 
 router = APIRouter(prefix="/api/comments", tags=["Comments"])
 
@@ -50,12 +55,21 @@ async def create_comment(
     )
 
     # Mark first response time for SLA tracking
-    if not ticket.first_response_at:
+    first_response = not ticket.first_response_at
+    if first_response:
         ticket.first_response_at = datetime.utcnow()
+        ticket_changes.record_change(db, ticket, ticket_changes.UPDATED)
 
     db.add(comment)
     db.commit()
     db.refresh(comment)
+    if first_response:
+        sla_at_risk_index.track(ticket)
+    if event_bus.has_subscribers:
+        event_bus.publish(
+            "comment.created", CommentResponse.model_validate(comment).model_dump(mode="json"),
+            ticket.created_by, ticket.assigned_to, internal=comment.is_internal
+        )
 
     # Send email notification to ticket creator and assignee (if not internal comment)
     if not comment_data.is_internal:
@@ -96,9 +110,10 @@ async def list_ticket_comments(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    conditional: ConditionalGet = Depends()
 ):
-    """List all comments for a ticket."""
+    """List all comments for a ticket (supports If-None-Match)."""
     # Verify ticket exists
     ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
     if not ticket:
@@ -121,6 +136,17 @@ async def list_ticket_comments(
     if current_user.role == UserRole.USER:
         query = query.filter(TicketComment.is_internal == False)
 
+    # Comments are never edited, so count and newest id identify the visible set
+    version = query.join(User, User.id == TicketComment.user_id).with_entities(
+        func.count(TicketComment.id), func.max(TicketComment.id),
+        func.max(TicketComment.created_at), func.max(User.updated_at)
+    ).one()
+    not_modified = conditional.match(
+        "comments", ticket_id, ticket.created_at, current_user.role == UserRole.USER, skip, limit, *version
+    )
+    if not_modified:
+        return not_modified
+
     comments = query.order_by(TicketComment.created_at.asc()).offset(skip).limit(limit).all()
     return comments
 
@@ -147,5 +173,10 @@ async def delete_comment(
             detail="Not authorized to delete this comment"
         )
 
+    ticket = comment.ticket
+    event_data = {"id": comment.id, "ticket_id": comment.ticket_id}
+    internal = comment.is_internal
+
     db.delete(comment)
     db.commit()
+    event_bus.publish("comment.deleted", event_data, ticket.created_by, ticket.assigned_to, internal=internal)
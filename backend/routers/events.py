@@ -0,0 +1,84 @@
+"""Real-time event stream API routes."""
+import asyncio
+import time
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from config import settings
+from database import SessionLocal
+from schemas import TokenData
+from auth import get_token_data, load_principal
+from event_bus import event_bus
+from token_versions import token_versions
+
+router = APIRouter(prefix="/api/events", tags=["Events"])
+
+
+@router.get("/tickets")
+async def stream_ticket_events(
+    request: Request,
+    token_data: TokenData = Depends(get_token_data)
+):
+    """Stream ticket and comment changes visible to the current user as Server-Sent Events.
+
+    Events: ``ticket.created``, ``ticket.updated``, ``ticket.deleted``,
+    ``comment.created`` and ``comment.deleted``. A ``resync`` event means
+    events were dropped and the client should re-fetch. The stream ends
+    when the access token expires or is revoked, so clients reconnect with
+    a fresh token.
+    """
+    # Not Depends(get_db): that session would stay open for the whole stream
+    db = SessionLocal()
+    try:
+        current_user = load_principal(token_data, db)
+    finally:
+        db.close()
+
+    subscription = event_bus.subscribe(current_user)
+
+    def token_valid() -> bool:
+        """In-memory expiry and revocation checks, run before every frame."""
+        if token_data.expires_at and datetime.utcnow() >= token_data.expires_at:
+            return False
+        return token_versions.is_current(token_data.user_id, token_data.token_version)
+
+    def principal_valid() -> bool:
+        """Re-check that the user still exists, is active and has the same role."""
+        db = SessionLocal()
+        try:
+            return load_principal(token_data, db).role == current_user.role
+        except HTTPException:
+            return False
+        finally:
+            db.close()
+
+    async def stream():
+        verified_at = time.monotonic()
+        try:
+            yield f"retry: {settings.EVENT_STREAM_RETRY_MS}\n\n"
+            while not subscription.overflowed:
+                try:
+                    frame = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=settings.EVENT_STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    frame = ": keep-alive\n\n"
+
+                # Busy streams rarely time out, so check on every frame
+                if await request.is_disconnected() or not token_valid():
+                    return
+                if time.monotonic() - verified_at >= settings.TOKEN_VERSION_REFRESH_SECONDS:
+                    if not await asyncio.to_thread(principal_valid):
+                        return
+                    verified_at = time.monotonic()
+                yield frame
+            yield "event: resync\ndata: {}\n\n"
+        finally:
+            event_bus.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,17 +1,23 @@
 """Knowledge Base API routes."""
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 
 from database import get_db
 from models import User, KnowledgeBaseArticle, KnowledgeBaseCategory, UserRole
 from schemas import (
     KBCategoryCreate, KBCategoryResponse,
-    KBArticleCreate, KBArticleUpdate, KBArticleResponse
+    KBArticleCreate, KBArticleUpdate, KBArticleResponse, KBTagCount
 )
 from auth import get_current_user, require_technician
+from search_index import kb_search_index
+from counter_service import kb_counter_buffer, COUNTER_FIELDS
+from cache import LRUCache
+from http_cache import make_etag, etag_matches, not_modified
+from config import settings
+import kb_graph
+from kb_suggestions import kb_suggestion_engine
 import re
 
 router = APIRouter(prefix="/api/kb", tags=["Knowledge Base"])
@@ -25,6 +31,117 @@ def generate_slug(title: str) -> str:
     return slug
 
 
+def with_pending_counts(article: KBArticleResponse) -> KBArticleResponse:
+    """Return an article response including counter increments not yet flushed."""
+    pending = kb_counter_buffer.pending(article.id)
+    return article.model_copy(update={
+        field: (getattr(article, field) or 0) + amount for field, amount in pending.items()
+    })
+
+
+# Rendered article cache: ("id", id) -> (response, etag, counter generation), ("slug", slug) -> id
+article_cache = LRUCache(maxsize=settings.KB_ARTICLE_CACHE_SIZE, ttl=settings.KB_ARTICLE_CACHE_TTL)
+
+
+def cache_article(article: KnowledgeBaseArticle, generation: int) -> Tuple[KBArticleResponse, str]:
+    """Serialize an article once and cache it with its ETag.
+
+    ``generation`` is the counter buffer generation read before the row was
+    loaded, so later flushes know whether the row already has their counts.
+    """
+    response = KBArticleResponse.model_validate(article)
+    etag = make_etag(
+        "kb-article",
+        article.id,
+        article.updated_at or article.created_at,
+        response.model_dump_json(exclude=set(COUNTER_FIELDS))
+    )
+    article_cache.set(("id", article.id), (response, etag, generation))
+    article_cache.set(("slug", article.slug), article.id)
+    return response, etag
+
+
+def get_cached_article(article_id: int, db: Session) -> Tuple[KBArticleResponse, str]:
+    """Get an article from the cache, loading it from the database on a miss."""
+    entry = article_cache.get(("id", article_id))
+    if entry is not None:
+        return entry[:2]
+
+    generation = kb_counter_buffer.generation
+    article = db.query(KnowledgeBaseArticle).filter(
+        KnowledgeBaseArticle.id == article_id
+    ).first()
+
+    if not article:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Article not found"
+        )
+
+    return cache_article(article, generation)
+
+
+def invalidate_article(article_id: int, *slugs: str):
+    """Drop an article and its slug mappings from the cache."""
+    article_cache.delete(("id", article_id))
+    for slug in slugs:
+        article_cache.delete(("slug", slug))
+
+
+def apply_flushed_counts(counts: Dict[int, Dict[str, int]], generation: int):
+    """Fold flushed counter increments into cached articles instead of reloading them.
+
+    Only entries loaded before the flush took its increments are updated.
+    Entries loaded while it was writing may or may not include them, so
+    those are dropped and reloaded.
+    """
+    def add_counts(increments):
+        def apply(entry):
+            article, etag, loaded_generation = entry
+            if loaded_generation >= generation:
+                return None
+            # Counters are excluded from the ETag, so it stays valid
+            return article.model_copy(update={
+                field: (getattr(article, field) or 0) + amount for field, amount in increments.items()
+            }), etag, loaded_generation
+        return apply
+
+    for article_id, increments in counts.items():
+        article_cache.update(("id", article_id), add_counts(increments))
+
+
+kb_counter_buffer.add_flush_listener(apply_flushed_counts)
+
+
+def serve_article(
+    entry: Tuple[KBArticleResponse, str],
+    request: Request,
+    response: Response,
+    current_user: User,
+    count_view: bool = False
+):
+    """Check access and return a cached article, or 304 if the client copy is current."""
+    article, etag = entry
+
+    # Check if user can view unpublished articles
+    if not article.is_published and current_user.role == UserRole.USER:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Article not published"
+        )
+
+    # Buffer the view; counters are flushed to the database in batches
+    if count_view:
+        kb_counter_buffer.increment(article.id, "view_count")
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    return with_pending_counts(article)
+
+
 # Category endpoints
 
 @router.post("/categories", response_model=KBCategoryResponse, status_code=status.HTTP_201_CREATED)
@@ -110,9 +227,13 @@ async def create_kb_article(
     )
 
     db.add(article)
+    db.flush()
+    kb_graph.sync_article(db, article)
     db.commit()
     db.refresh(article)
 
+    kb_suggestion_engine.upsert(article)
+
     return article
 
 
@@ -121,6 +242,7 @@ async def list_kb_articles(
     category_id: Optional[int] = None,
     search: Optional[str] = None,
     featured_only: bool = False,
+    tag: Optional[str] = None,
     published_only: bool = True,
     skip: int = 0,
     limit: int = 100,
@@ -140,39 +262,53 @@ async def list_kb_articles(
     if featured_only:
         query = query.filter(KnowledgeBaseArticle.is_featured == True)
 
-    if search:
-        search_filter = or_(
-            KnowledgeBaseArticle.title.ilike(f"%{search}%"),
-            KnowledgeBaseArticle.content.ilike(f"%{search}%"),
-            KnowledgeBaseArticle.summary.ilike(f"%{search}%"),
-            KnowledgeBaseArticle.tags.ilike(f"%{search}%")
-        )
-        query = query.filter(search_filter)
+    if tag:
+        query = kb_graph.filter_by_tag(query, tag)
 
-    articles = query.order_by(
+    order_by = [
         KnowledgeBaseArticle.is_featured.desc(),
         KnowledgeBaseArticle.view_count.desc()
-    ).offset(skip).limit(limit).all()
+    ]
 
+    # Full-text search ranked by relevance, with highlighted content snippets
+    snippet = None
+    if search:
+        query, rank, snippet = kb_search_index.apply_with_snippets(query, search, "content")
+        if rank is not None:
+            order_by.insert(0, rank)
+
+    results = query.order_by(*order_by).offset(skip).limit(limit).all()
+
+    if snippet is None:
+        return results
+
+    articles = []
+    for article, raw_snippet in results:
+        article.snippet = kb_search_index.format_snippet(raw_snippet)
+        articles.append(article)
     return articles
 
 
-@router.get("/articles/slug/{slug}", response_model=KBArticleResponse)
-async def get_kb_article_by_slug(
-    slug: str,
+@router.get("/tags", response_model=List[KBTagCount])
+async def list_kb_tags(
+    limit: int = 100,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Get knowledge base article by slug."""
-    article = db.query(KnowledgeBaseArticle).filter(
-        KnowledgeBaseArticle.slug == slug
-    ).first()
+    """List knowledge base tags with article counts."""
+    published_only = current_user.role == UserRole.USER
+    tag_counts = kb_graph.get_tag_counts(db, published_only=published_only, limit=limit)
+    return [KBTagCount(name=name, article_count=count) for name, count in tag_counts]
 
-    if not article:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Article not found"
-        )
+
+@router.get("/articles/{article_id}/related", response_model=List[KBArticleResponse])
+async def list_related_articles(
+    article_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List articles related to an article."""
+    article, _ = get_cached_article(article_id, db)
 
     # Check if user can view unpublished articles
     if not article.is_published and current_user.role == UserRole.USER:
@@ -181,38 +317,54 @@ async def get_kb_article_by_slug(
             detail="Article not published"
         )
 
-    # Increment view count
-    article.view_count += 1
-    db.commit()
+    related = kb_graph.get_related_articles(
+        db, [article_id], published_only=current_user.role == UserRole.USER
+    )
+    return related[article_id]
 
-    return article
+
+@router.get("/articles/slug/{slug}", response_model=KBArticleResponse)
+async def get_kb_article_by_slug(
+    slug: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get knowledge base article by slug."""
+    article_id = article_cache.get(("slug", slug))
+    entry = article_cache.get(("id", article_id)) if article_id is not None else None
+
+    if entry is None:
+        generation = kb_counter_buffer.generation
+        article = db.query(KnowledgeBaseArticle).filter(
+            KnowledgeBaseArticle.slug == slug
+        ).first()
+
+        if not article:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Article not found"
+            )
+
+        entry = cache_article(article, generation)
+    else:
+        entry = entry[:2]
+
+    return serve_article(entry, request, response, current_user, count_view=True)
 
 
 @router.get("/articles/{article_id}", response_model=KBArticleResponse)
 async def get_kb_article(
     article_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Get knowledge base article by ID."""
-    article = db.query(KnowledgeBaseArticle).filter(
-        KnowledgeBaseArticle.id == article_id
-    ).first()
-
-    if not article:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Article not found"
-        )
-
-    # Check if user can view unpublished articles
-    if not article.is_published and current_user.role == UserRole.USER:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Article not published"
-        )
-
-    return article
+    entry = get_cached_article(article_id, db)
+    return serve_article(entry, request, response, current_user)
 
 
 @router.patch("/articles/{article_id}", response_model=KBArticleResponse)
@@ -245,6 +397,7 @@ async def update_kb_article(
         ).first()
         if existing_slug:
             new_slug = f"{new_slug}-{int(datetime.utcnow().timestamp())}"
+        invalidate_article(article.id, article.slug)
         article.slug = new_slug
 
     for field, value in update_data.items():
@@ -255,10 +408,18 @@ async def update_kb_article(
     if article_data.is_published and not article.published_at:
         article.published_at = datetime.utcnow()
 
+    if "tags" in update_data:
+        kb_graph.sync_article_tags(db, article)
+    if "related_articles" in update_data:
+        kb_graph.sync_related_articles(db, article)
+
     db.commit()
     db.refresh(article)
 
-    return article
+    invalidate_article(article.id)
+    kb_suggestion_engine.upsert(article)
+
+    return with_pending_counts(KBArticleResponse.model_validate(article))
 
 
 @router.delete("/articles/{article_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -278,9 +439,13 @@ async def delete_kb_article(
             detail="Article not found"
         )
 
+    kb_graph.remove_article(db, article_id)
     db.delete(article)
     db.commit()
 
+    invalidate_article(article_id, article.slug)
+    kb_suggestion_engine.remove(article_id)
+
 
 @router.post("/articles/{article_id}/helpful", response_model=KBArticleResponse)
 async def mark_article_helpful(
@@ -290,22 +455,8 @@ async def mark_article_helpful(
     current_user: User = Depends(get_current_user)
 ):
     """Mark article as helpful or not helpful."""
-    article = db.query(KnowledgeBaseArticle).filter(
-        KnowledgeBaseArticle.id == article_id
-    ).first()
+    article, _ = get_cached_article(article_id, db)
 
-    if not article:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Article not found"
-        )
-
-    if helpful:
-        article.helpful_count += 1
-    else:
-        article.not_helpful_count += 1
+    kb_counter_buffer.increment(article.id, "helpful_count" if helpful else "not_helpful_count")
 
-    db.commit()
-    db.refresh(article)
-
-    return article
+    return with_pending_counts(article)
@@ -1,16 +1,32 @@
 """SLA policy management API routes."""
+from datetime import datetime
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 
 from database import get_db
-from models import User, SLAPolicy
-from schemas import SLAPolicyCreate, SLAPolicyUpdate, SLAPolicyResponse
-from auth import require_admin
+from models import User, Ticket, SLAPolicy, BusinessCalendar, BusinessHoliday, SLAPolicyCalendar
+from schemas import (
+    SLAPolicyCreate, SLAPolicyUpdate, SLAPolicyResponse, SLAAtRiskTicket,
+    BusinessCalendarCreate, BusinessCalendarUpdate, BusinessCalendarResponse
+)
+from auth import require_admin, require_technician
+from business_hours import parse_work_days, validate_calendar
+from sla_registry import sla_registry
+from sla_at_risk import open_deadlines, sla_at_risk_index
 
 router = APIRouter(prefix="/api/sla", tags=["SLA Policies"])
 
 
+def check_calendar_exists(calendar_id: int, db: Session):
+    """Reject a policy referencing a missing business calendar."""
+    if not db.query(BusinessCalendar.id).filter(BusinessCalendar.id == calendar_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Business calendar not found"
+        )
+
+
 @router.post("", response_model=SLAPolicyResponse, status_code=status.HTTP_201_CREATED)
 async def create_sla_policy(
     sla_data: SLAPolicyCreate,
@@ -26,18 +42,23 @@ async def create_sla_policy(
             detail="SLA policy name already exists"
         )
 
+    if sla_data.calendar_id is not None:
+        check_calendar_exists(sla_data.calendar_id, db)
+
     sla_policy = SLAPolicy(
         name=sla_data.name,
         description=sla_data.description,
         priority=sla_data.priority,
         response_time_hours=sla_data.response_time_hours,
         resolution_time_hours=sla_data.resolution_time_hours,
-        is_active=sla_data.is_active
+        is_active=sla_data.is_active,
+        calendar_id=sla_data.calendar_id
     )
 
     db.add(sla_policy)
     db.commit()
     db.refresh(sla_policy)
+    sla_registry.invalidate()
 
     return sla_policy
 
@@ -60,6 +81,199 @@ async def list_sla_policies(
     return sla_policies
 
 
+# At-risk queue and business calendars (declared before /{sla_id} so their paths
+# are not taken for a policy id)
+
+@router.get("/at-risk", response_model=List[SLAAtRiskTicket])
+async def list_at_risk_tickets(
+    limit: int = Query(20, ge=1, le=500),
+    include_breached: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_technician)
+):
+    """List the open tickets closest to breaching their SLA (technician/admin only)."""
+    while True:
+        entries = sla_at_risk_index.at_risk(limit, include_breached=include_breached)
+        if not entries:
+            return []
+
+        tickets = {
+            ticket.id: ticket
+            for ticket in db.query(Ticket).filter(Ticket.id.in_([entry[1] for entry in entries])).all()
+        }
+
+        # The index may lag changes made by other workers; correct it and
+        # query again so stale entries don't hide tickets that are at risk
+        stale = False
+        for due_at, ticket_id, deadline in entries:
+            ticket = tickets.get(ticket_id)
+            if ticket is None:
+                sla_at_risk_index.remove(ticket_id)
+                stale = True
+            elif dict(open_deadlines(ticket.status, ticket.first_response_at, ticket.sla_response_due,
+                                     ticket.sla_resolution_due)).get(deadline) != due_at:
+                sla_at_risk_index.track(ticket)
+                stale = True
+        if not stale:
+            break
+
+    now = datetime.utcnow()
+    results = []
+    for due_at, ticket_id, deadline in entries:
+        ticket = tickets[ticket_id]
+        results.append(SLAAtRiskTicket(
+            ticket_id=ticket.id,
+            ticket_number=ticket.ticket_number,
+            title=ticket.title,
+            priority=ticket.priority,
+            status=ticket.status,
+            assigned_to=ticket.assigned_to,
+            deadline=deadline,
+            due_at=due_at,
+            hours_remaining=round((due_at - now).total_seconds() / 3600, 2),
+            breached=due_at < now
+        ))
+    return results
+
+
+def apply_calendar_fields(calendar: BusinessCalendar, data: dict):
+    """Validate and copy calendar fields onto a calendar row."""
+    tz_name = data.get("timezone", calendar.timezone)
+    work_days = data.get("work_days", parse_work_days(calendar.work_days or ""))
+    work_start = data.get("work_start", calendar.work_start)
+    work_end = data.get("work_end", calendar.work_end)
+
+    error = validate_calendar(tz_name, work_days, work_start, work_end)
+    if error:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=error
+        )
+
+    for field in ("name", "description"):
+        if field in data:
+            setattr(calendar, field, data[field])
+    calendar.timezone = tz_name
+    calendar.work_days = ",".join(str(day) for day in sorted(set(work_days)))
+    calendar.work_start = work_start
+    calendar.work_end = work_end
+
+    if data.get("holidays") is not None:
+        holidays = {holiday["date"]: holiday.get("name") for holiday in data["holidays"]}
+        calendar.holidays = [
+            BusinessHoliday(date=day, name=name) for day, name in sorted(holidays.items())
+        ]
+
+
+@router.post("/calendars", response_model=BusinessCalendarResponse, status_code=status.HTTP_201_CREATED)
+async def create_business_calendar(
+    calendar_data: BusinessCalendarCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Create a business calendar (admin only)."""
+    existing = db.query(BusinessCalendar).filter(BusinessCalendar.name == calendar_data.name).first()
+    if existing:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Business calendar name already exists"
+        )
+
+    calendar = BusinessCalendar()
+    apply_calendar_fields(calendar, calendar_data.model_dump())
+
+    db.add(calendar)
+    db.commit()
+    db.refresh(calendar)
+
+    return calendar
+
+
+@router.get("/calendars", response_model=List[BusinessCalendarResponse])
+async def list_business_calendars(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """List business calendars (admin only)."""
+    return db.query(BusinessCalendar).order_by(BusinessCalendar.name).all()
+
+
+@router.get("/calendars/{calendar_id}", response_model=BusinessCalendarResponse)
+async def get_business_calendar(
+    calendar_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Get business calendar by ID (admin only)."""
+    calendar = db.query(BusinessCalendar).filter(BusinessCalendar.id == calendar_id).first()
+
+    if not calendar:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Business calendar not found"
+        )
+
+    return calendar
+
+
+@router.patch("/calendars/{calendar_id}", response_model=BusinessCalendarResponse)
+async def update_business_calendar(
+    calendar_id: int,
+    calendar_data: BusinessCalendarUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Update business calendar (admin only).
+
+    Only tickets created afterwards get deadlines from the new hours.
+    """
+    calendar = db.query(BusinessCalendar).filter(BusinessCalendar.id == calendar_id).first()
+
+    if not calendar:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Business calendar not found"
+        )
+
+    update_data = {
+        field: value for field, value in calendar_data.model_dump(exclude_unset=True).items()
+        if value is not None or field == "description"
+    }
+    apply_calendar_fields(calendar, update_data)
+
+    db.commit()
+    db.refresh(calendar)
+    sla_registry.invalidate()
+
+    return calendar
+
+
+@router.delete("/calendars/{calendar_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_business_calendar(
+    calendar_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Delete business calendar (admin only)."""
+    calendar = db.query(BusinessCalendar).filter(BusinessCalendar.id == calendar_id).first()
+
+    if not calendar:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Business calendar not found"
+        )
+
+    # Check if calendar is in use
+    if db.query(SLAPolicyCalendar).filter(SLAPolicyCalendar.calendar_id == calendar_id).first():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot delete business calendar that is in use by SLA policies"
+        )
+
+    db.delete(calendar)
+    db.commit()
+
+
 @router.get("/{sla_id}", response_model=SLAPolicyResponse)
 async def get_sla_policy(
     sla_id: int,
@@ -96,12 +310,18 @@ async def update_sla_policy(
 
     # Update fields
     update_data = sla_data.model_dump(exclude_unset=True)
+    if "calendar_id" in update_data:
+        calendar_id = update_data.pop("calendar_id")
+        if calendar_id is not None:
+            check_calendar_exists(calendar_id, db)
+        sla_policy.calendar_id = calendar_id
     for field, value in update_data.items():
         if value is not None:
             setattr(sla_policy, field, value)
 
     db.commit()
     db.refresh(sla_policy)
+    sla_registry.invalidate()
 
     return sla_policy
 
@@ -130,3 +350,4 @@ async def delete_sla_policy(
 
     db.delete(sla_policy)
     db.commit()
+    sla_registry.invalidate()
@@ -1,15 +1,33 @@
 """Enhanced ticket management API routes with email, SLA, and search."""
+import asyncio
+from collections import defaultdict
 from typing import List, Optional
-from datetime import datetime, timedelta
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
+from datetime import datetime
+import io
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session, selectinload, aliased
+from sqlalchemy import or_, and_, func
 
 from database import get_db
-from models import User, Ticket, TicketStatus, TicketPriority, UserRole, SLAPolicy
-from schemas import TicketCreate, TicketUpdate, TicketResponse, TicketSearchParams
-from auth import get_current_user, require_technician
+from models import User, Ticket, TicketStatus, TicketPriority, UserRole, TicketComment, TicketSignature, TicketChange
+from schemas import (
+    TicketCreate, TicketUpdate, TicketResponse, TicketSearchParams,
+    TicketBulkUpdate, TicketBulkUpdateResponse, TicketImportResult, TicketChangesResponse, UserResponse
+)
+from auth import get_current_user, require_technician, require_admin
 from email_service import email_service
+from search_index import ticket_search_index
+from kb_suggestions import kb_suggestion_engine
+from duplicate_detector import duplicate_detector
+from ticket_import import import_file, detect_format, IMPORT_FORMATS
+from sla_registry import sla_registry
+from sla_at_risk import sla_at_risk_index
+from event_bus import event_bus
+import ticket_changes
+from http_cache import ConditionalGet
+from config import settings
 
 router = APIRouter(prefix="/api/tickets", tags=["Tickets"])
 
@@ -32,16 +50,27 @@ def generate_ticket_number(db: Session) -> str:
 
 def apply_sla_policy(ticket: Ticket, db: Session):
     """Apply SLA policy to ticket based on priority."""
-    # Find active SLA policy matching the ticket priority
-    sla_policy = db.query(SLAPolicy).filter(
-        SLAPolicy.priority == ticket.priority.value,
-        SLAPolicy.is_active == True
-    ).first()
+    # Due dates need the creation time before the row exists, so stamp it here
+    if ticket.created_at is None:
+        ticket.created_at = datetime.utcnow()
+
+    sla_policy = sla_registry.get(db, ticket.priority.value)
 
     if sla_policy:
         ticket.sla_policy_id = sla_policy.id
-        ticket.sla_response_due = ticket.created_at + timedelta(hours=sla_policy.response_time_hours)
-        ticket.sla_resolution_due = ticket.created_at + timedelta(hours=sla_policy.resolution_time_hours)
+        ticket.sla_response_due, ticket.sla_resolution_due = sla_registry.due_dates(
+            sla_policy, ticket.created_at
+        )
+
+
+def publish_ticket_event(event_type: str, ticket: Ticket):
+    """Push a ticket change to connected clients allowed to see the ticket."""
+    if not event_bus.has_subscribers:
+        return
+    data = TicketResponse.model_validate(ticket).model_dump(
+        mode="json", exclude={"suggested_articles", "duplicate_of"}
+    )
+    event_bus.publish(event_type, data, ticket.created_by, ticket.assigned_to)
 
 
 def check_sla_breach(ticket: Ticket):
@@ -59,6 +88,18 @@ def check_sla_breach(ticket: Ticket):
             ticket.sla_resolution_breached = True
 
 
+def sla_breach_pending(ticket) -> bool:
+    """Whether ``check_sla_breach`` would flag a breach that is not recorded yet."""
+    now = datetime.utcnow()
+    return bool(
+        (not ticket.sla_response_breached and ticket.sla_response_due and not ticket.first_response_at
+         and now > ticket.sla_response_due)
+        or (not ticket.sla_resolution_breached and ticket.sla_resolution_due
+            and ticket.status not in [TicketStatus.RESOLVED, TicketStatus.CLOSED]
+            and now > ticket.sla_resolution_due)
+    )
+
+
 @router.post("", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
 async def create_ticket(
     ticket_data: TicketCreate,
@@ -80,8 +121,48 @@ async def create_ticket(
     apply_sla_policy(ticket, db)
 
     db.add(ticket)
+    db.flush()
+
+    # Link near-duplicates of an open incident to it, closing them if auto-merge is on
+    duplicate_of = None
+    match = duplicate_detector.link(db, ticket)
+    parent = None
+    if match:
+        parent = db.query(
+            Ticket.ticket_number, Ticket.created_by, Ticket.assigned_to
+        ).filter(Ticket.id == match[0]).first()
+    # link() only returns existing parents; a concurrent delete still means no match
+    if parent:
+        parent_id, similarity = match
+        # Regular users only learn about parents they could open themselves
+        parent_visible = current_user.role != UserRole.USER or current_user.id in (
+            parent.created_by, parent.assigned_to
+        )
+        if settings.DUPLICATE_AUTO_MERGE:
+            ticket.status = TicketStatus.CLOSED
+            ticket.closed_at = datetime.utcnow()
+            db.add(TicketComment(
+                ticket_id=ticket.id,
+                user_id=current_user.id,
+                comment_text=(
+                    f"Merged into {parent.ticket_number} as a duplicate." if parent_visible
+                    else "Merged into an existing ticket as a duplicate."
+                ),
+                is_internal=False
+            ))
+        if parent_visible:
+            duplicate_of = {
+                "ticket_id": parent_id,
+                "ticket_number": parent.ticket_number,
+                "similarity": similarity,
+                "merged": settings.DUPLICATE_AUTO_MERGE
+            }
+
+    ticket_changes.record_change(db, ticket, ticket_changes.CREATED)
     db.commit()
     db.refresh(ticket)
+    sla_at_risk_index.track(ticket)
+    publish_ticket_event("ticket.created", ticket)
 
     # Send email notification to creator
     await email_service.send_ticket_created_notification(
@@ -92,6 +173,10 @@ async def create_ticket(
         creator_name=current_user.first_name or current_user.username
     )
 
+    # Point the user to existing KB articles that may already solve the issue
+    ticket.suggested_articles = kb_suggestion_engine.suggest(ticket.title, ticket.description)
+    ticket.duplicate_of = duplicate_of
+
     return ticket
 
 
@@ -123,14 +208,10 @@ async def search_tickets(
             )
         )
 
-    # Full-text search on title and description
+    # Full-text search on ticket number, title and description
+    rank = None
     if query:
-        search_filter = or_(
-            Ticket.title.ilike(f"%{query}%"),
-            Ticket.description.ilike(f"%{query}%"),
-            Ticket.ticket_number.ilike(f"%{query}%")
-        )
-        ticket_query = ticket_query.filter(search_filter)
+        ticket_query, rank = ticket_search_index.apply(ticket_query, query)
 
     # Apply filters
     if status:
@@ -156,7 +237,9 @@ async def search_tickets(
                 )
             )
 
-    tickets = ticket_query.order_by(Ticket.created_at.desc()).offset(skip).limit(limit).all()
+    # Order by relevance when searching, newest first otherwise
+    order_by = [rank, Ticket.created_at.desc()] if rank is not None else [Ticket.created_at.desc()]
+    tickets = ticket_query.order_by(*order_by).offset(skip).limit(limit).all()
 
     # Update SLA breach status for each ticket
     for ticket in tickets:
@@ -212,16 +295,281 @@ async def list_tickets(
     return tickets
 
 
+@router.get("/changes", response_model=TicketChangesResponse)
+async def list_ticket_changes(
+    since: Optional[int] = Query(None, ge=0, description="Watermark returned by the previous call"),
+    limit: int = Query(500, ge=1, le=settings.TICKET_CHANGES_MAX),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Get tickets created, updated or deleted since a watermark.
+
+    Without ``since`` only the current watermark is returned: read it, then
+    load the ticket list, then poll with it. Page while ``has_more`` is set.
+    """
+    if since is None:
+        return {"watermark": ticket_changes.current_watermark(db)}
+
+    if ticket_changes.is_expired(db, since):
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Watermark is older than the change history; re-fetch the ticket list"
+        )
+
+    changes, watermark, has_more = ticket_changes.changes_since(db, since, limit, current_user)
+
+    changed_ids = [ticket_id for ticket_id, change_type in changes if change_type != ticket_changes.DELETED]
+    tickets = {}
+    if changed_ids:
+        tickets = {
+            ticket.id: ticket
+            for ticket in db.query(Ticket).options(
+                selectinload(Ticket.creator), selectinload(Ticket.assignee), selectinload(Ticket.category)
+            ).filter(Ticket.id.in_(changed_ids)).all()
+        }
+
+    # The log records who could see a ticket when it changed; regular users
+    # only get tickets they can still open and must drop the rest
+    if current_user.role == UserRole.USER:
+        tickets = {
+            ticket_id: ticket for ticket_id, ticket in tickets.items()
+            if current_user.id in (ticket.created_by, ticket.assigned_to)
+        }
+
+    return {
+        "tickets": [tickets[ticket_id] for ticket_id in changed_ids if ticket_id in tickets],
+        # Deleted, or no longer visible (reassigned, or deleted after this page's changes were read)
+        "deleted": [
+            ticket_id for ticket_id, change_type in changes
+            if change_type == ticket_changes.DELETED or ticket_id not in tickets
+        ],
+        "watermark": watermark,
+        "has_more": has_more
+    }
+
+
+@router.patch("/bulk", response_model=TicketBulkUpdateResponse)
+async def bulk_update_tickets(
+    bulk_data: TicketBulkUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Apply status, priority and assignee changes to many tickets in one transaction."""
+    ticket_ids = list(dict.fromkeys(bulk_data.ticket_ids))
+    if len(ticket_ids) > settings.TICKET_BULK_MAX:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many tickets. Maximum is {settings.TICKET_BULK_MAX} per request"
+        )
+
+    # Regular users can't assign tickets or change their status
+    if current_user.role == UserRole.USER:
+        bulk_data.assigned_to = None
+        bulk_data.status = None
+
+    values = {
+        field: value
+        for field, value in bulk_data.model_dump(exclude={"ticket_ids"}).items()
+        if value is not None
+    }
+    if not values:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No changes specified"
+        )
+
+    assignee = None
+    if bulk_data.assigned_to is not None:
+        assignee = db.query(User).filter(User.id == bulk_data.assigned_to).first()
+        if not assignee:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Assignee not found"
+            )
+        if assignee.role not in [UserRole.TECHNICIAN, UserRole.ADMIN]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Can only assign to technicians or admins"
+            )
+        values.setdefault("status", TicketStatus.ASSIGNED)
+
+    # Existence, permissions and previous state for every ticket in one query
+    rows = db.query(
+        Ticket.id, Ticket.ticket_number, Ticket.title, Ticket.status, Ticket.priority,
+        Ticket.created_by, Ticket.assigned_to,
+        Ticket.first_response_at, Ticket.sla_response_due, Ticket.sla_resolution_due
+    ).filter(Ticket.id.in_(ticket_ids)).all()
+    found = {row.id: row for row in rows}
+
+    not_found = [ticket_id for ticket_id in ticket_ids if ticket_id not in found]
+    forbidden = []
+    if current_user.role == UserRole.USER:
+        forbidden = [ticket_id for ticket_id, row in found.items() if row.created_by != current_user.id]
+    allowed = [ticket_id for ticket_id in ticket_ids if ticket_id in found and ticket_id not in forbidden]
+
+    if allowed:
+        now = datetime.utcnow()
+        db.query(Ticket).filter(Ticket.id.in_(allowed)).update(values, synchronize_session=False)
+
+        # Keep the first resolution/closure time, as single updates do
+        if values.get("status") == TicketStatus.RESOLVED:
+            db.query(Ticket).filter(
+                Ticket.id.in_(allowed), Ticket.resolved_at == None
+            ).update({"resolved_at": now}, synchronize_session=False)
+        elif values.get("status") == TicketStatus.CLOSED:
+            db.query(Ticket).filter(
+                Ticket.id.in_(allowed), Ticket.closed_at == None
+            ).update({"closed_at": now}, synchronize_session=False)
+
+        if "status" in values:
+            duplicate_detector.sync_statuses(db, allowed)
+
+        ticket_changes.record_changes(db, (
+            (ticket_id, found[ticket_id].created_by, values.get("assigned_to", found[ticket_id].assigned_to))
+            for ticket_id in allowed
+        ), ticket_changes.UPDATED)
+        if "assigned_to" in values:
+            # Previous assignees learn they lost access on their next sync
+            ticket_changes.record_changes(db, (
+                (ticket_id, found[ticket_id].created_by, found[ticket_id].assigned_to)
+                for ticket_id in allowed
+                if found[ticket_id].assigned_to not in (None, values["assigned_to"])
+            ), ticket_changes.UPDATED)
+
+        db.commit()
+
+        if "status" in values:
+            for ticket_id in allowed:
+                row = found[ticket_id]
+                sla_at_risk_index.update(
+                    ticket_id, values["status"], row.first_response_at,
+                    row.sla_response_due, row.sla_resolution_due
+                )
+
+        # Clients merge the changed fields into the tickets they already have
+        if event_bus.has_subscribers:
+            changes = jsonable_encoder(values)
+            if assignee:
+                changes["assignee"] = UserResponse.model_validate(assignee).model_dump(mode="json")
+            for ticket_id in allowed:
+                row = found[ticket_id]
+                event_bus.publish(
+                    "ticket.updated",
+                    {"id": ticket_id, "ticket_number": row.ticket_number, "updated_at": now.isoformat(), **changes},
+                    row.created_by, values.get("assigned_to", row.assigned_to)
+                )
+
+        notifications = []
+
+        # One digest per ticket creator whose tickets changed status (assignment alone
+        # only notifies the assignee, as with single assignments)
+        new_status = bulk_data.status
+        status_changes = defaultdict(list)
+        if new_status:
+            for ticket_id in allowed:
+                row = found[ticket_id]
+                if row.status != new_status:
+                    status_changes[row.created_by].append({
+                        "ticket_number": row.ticket_number,
+                        "ticket_id": row.id,
+                        "title": row.title,
+                        "detail": f"{row.status.value.replace('_', ' ').title()} → "
+                                  f"{new_status.value.replace('_', ' ').title()}"
+                    })
+        if status_changes:
+            creators = db.query(User).filter(User.id.in_(list(status_changes))).all()
+            for creator in creators:
+                notifications.append(email_service.send_ticket_digest_notification(
+                    recipient_email=creator.email,
+                    recipient_name=creator.first_name or creator.username,
+                    subject=f"Ticket Status Updated: {len(status_changes[creator.id])} ticket(s)",
+                    intro="The status of the following support tickets has been updated.",
+                    tickets=status_changes[creator.id]
+                ))
+
+        # One digest for the new assignee
+        if assignee:
+            newly_assigned = [
+                {
+                    "ticket_number": found[ticket_id].ticket_number,
+                    "ticket_id": ticket_id,
+                    "title": found[ticket_id].title,
+                    "detail": f"Priority: {(values.get('priority') or found[ticket_id].priority).value.upper()}"
+                }
+                for ticket_id in allowed
+                if found[ticket_id].assigned_to != assignee.id
+            ]
+            if newly_assigned:
+                notifications.append(email_service.send_ticket_digest_notification(
+                    recipient_email=assignee.email,
+                    recipient_name=assignee.first_name or assignee.username,
+                    subject=f"Tickets Assigned: {len(newly_assigned)} ticket(s)",
+                    intro="The following support tickets have been assigned to you.",
+                    tickets=newly_assigned
+                ))
+
+        # Hand notifications off so the response does not wait on SMTP
+        if notifications:
+            asyncio.create_task(email_service.send_many(notifications))
+
+    return {
+        "updated": len(allowed),
+        "ticket_ids": allowed,
+        "not_found": not_found,
+        "forbidden": forbidden
+    }
+
+
+@router.post("/import", response_model=TicketImportResult)
+async def import_tickets(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, description="csv or ndjson (guessed from the file name)"),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(require_admin)
+):
+    """Bulk import historical tickets from a CSV or NDJSON file (admin only)."""
+    fmt = format or detect_format(file.filename)
+    if fmt not in IMPORT_FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format. Use one of: {', '.join(IMPORT_FORMATS)}"
+        )
+
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    # Large imports take a while; keep them off the event loop
+    report = await run_in_threadpool(import_file, db, stream, fmt, current_user.id)
+
+    # Too many rows for individual events; staff clients re-fetch instead
+    if report["imported"]:
+        event_bus.publish("ticket.imported", {"imported": report["imported"]}, created_by=None)
+    return report
+
+
 @router.get("/{ticket_id}", response_model=TicketResponse)
 async def get_ticket(
     ticket_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: User = Depends(get_current_user),
+    conditional: ConditionalGet = Depends()
 ):
-    """Get ticket by ID."""
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
-
-    if not ticket:
+    """Get ticket by ID (supports If-None-Match)."""
+    # Version columns only; the full ticket is loaded when the client copy is stale
+    creator = aliased(User)
+    assignee = aliased(User)
+    last_change = db.query(func.max(TicketChange.seq)).filter(
+        TicketChange.ticket_id == ticket_id
+    ).scalar_subquery()
+    version = db.query(
+        Ticket.created_by, Ticket.assigned_to, Ticket.created_at, Ticket.updated_at,
+        Ticket.status, Ticket.first_response_at, Ticket.sla_response_due, Ticket.sla_resolution_due,
+        Ticket.sla_response_breached, Ticket.sla_resolution_breached,
+        creator.updated_at.label("creator_updated_at"), assignee.updated_at.label("assignee_updated_at"),
+        last_change.label("last_change")
+    ).outerjoin(creator, creator.id == Ticket.created_by).outerjoin(
+        assignee, assignee.id == Ticket.assigned_to
+    ).filter(Ticket.id == ticket_id).first()
+
+    if not version:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Ticket not found"
@@ -229,12 +577,23 @@ async def get_ticket(
 
     # Check permissions
     if current_user.role == UserRole.USER:
-        if ticket.created_by != current_user.id and ticket.assigned_to != current_user.id:
+        if version.created_by != current_user.id and version.assigned_to != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Not authorized to view this ticket"
             )
 
+    # A pending breach flag must still be saved, so take the full path
+    if not sla_breach_pending(version):
+        not_modified = conditional.match(
+            "ticket", ticket_id, version.created_at, version.updated_at, version.last_change,
+            version.creator_updated_at, version.assignee_updated_at
+        )
+        if not_modified:
+            return not_modified
+
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+
     # Update SLA breach status
     check_sla_breach(ticket)
     db.commit()
@@ -242,6 +601,37 @@ async def get_ticket(
     return ticket
 
 
+@router.get("/{ticket_id}/duplicates", response_model=List[TicketResponse])
+async def list_ticket_duplicates(
+    ticket_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """List tickets detected as near-duplicates of a ticket."""
+    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ticket not found"
+        )
+
+    query = db.query(Ticket).join(
+        TicketSignature, TicketSignature.ticket_id == Ticket.id
+    ).filter(TicketSignature.parent_ticket_id == ticket_id)
+
+    # Regular users only see duplicates they raised or are assigned to
+    if current_user.role == UserRole.USER:
+        query = query.filter(
+            or_(
+                Ticket.created_by == current_user.id,
+                Ticket.assigned_to == current_user.id
+            )
+        )
+
+    return query.order_by(Ticket.created_at).all()
+
+
 @router.patch("/{ticket_id}", response_model=TicketResponse)
 async def update_ticket(
     ticket_id: int,
@@ -271,6 +661,7 @@ async def update_ticket(
 
     # Store old status for email notification
     old_status = ticket.status
+    old_assignee = ticket.assigned_to
 
     # Update fields
     update_data = ticket_data.model_dump(exclude_unset=True)
@@ -285,8 +676,15 @@ async def update_ticket(
     elif ticket_data.status == TicketStatus.CLOSED and not ticket.closed_at:
         ticket.closed_at = datetime.utcnow()
 
+    # Re-sign edited text and drop closed tickets from the duplicate index
+    if {"title", "description", "status"} & update_data.keys():
+        duplicate_detector.sync(db, ticket)
+
+    ticket_changes.record_change(db, ticket, ticket_changes.UPDATED, previous_assignee=old_assignee)
     db.commit()
     db.refresh(ticket)
+    sla_at_risk_index.track(ticket)
+    publish_ticket_event("ticket.updated", ticket)
 
     # Send status change email notification
     if ticket_data.status and ticket_data.status != old_status:
@@ -320,8 +718,17 @@ async def delete_ticket(
             detail="Ticket not found"
         )
 
+    created_by, assigned_to = ticket.created_by, ticket.assigned_to
+    ticket_number = ticket.ticket_number
+
+    duplicate_detector.remove(db, ticket.id)
+    ticket_changes.record_change(db, ticket, ticket_changes.DELETED)
     db.delete(ticket)
     db.commit()
+    sla_at_risk_index.remove(ticket_id)
+    event_bus.publish(
+        "ticket.deleted", {"id": ticket_id, "ticket_number": ticket_number}, created_by, assigned_to
+    )
 
 
 @router.post("/{ticket_id}/assign", response_model=TicketResponse)
@@ -354,11 +761,15 @@ async def assign_ticket(
             detail="Can only assign to technicians or admins"
         )
 
+    old_assignee = ticket.assigned_to
     ticket.assigned_to = assignee_id
     ticket.status = TicketStatus.ASSIGNED
+    ticket_changes.record_change(db, ticket, ticket_changes.UPDATED, previous_assignee=old_assignee)
 
     db.commit()
     db.refresh(ticket)
+    sla_at_risk_index.track(ticket)
+    publish_ticket_event("ticket.updated", ticket)
 
     # Send email notification to assignee
     await email_service.send_ticket_assigned_notification(
@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from database import get_db
 from models import User, UserRole
 from schemas import UserResponse, UserUpdate
-from auth import get_current_user, require_admin
+from auth import get_current_user, require_admin, invalidate_principal, revoke_tokens
 
 router = APIRouter(prefix="/api/users", tags=["Users"])
 
@@ -86,6 +86,8 @@ async def update_user(
         user_data.role = None
         user_data.is_active = None
 
+    old_role, old_is_active = user.role, user.is_active
+
     # Update user fields
     for field, value in user_data.model_dump(exclude_unset=True).items():
         if value is not None:
@@ -94,6 +96,12 @@ async def update_user(
     db.commit()
     db.refresh(user)
 
+    # Tokens carry the role, so role and status changes revoke them
+    if user.role != old_role or user.is_active != old_is_active:
+        revoke_tokens(db, user.id)
+    else:
+        invalidate_principal(user.id)
+
     return user
 
 
@@ -118,5 +126,7 @@ async def delete_user(
             detail="Cannot delete your own account"
         )
 
+    # Revoke first so open event streams and cached principals stop at once
+    revoke_tokens(db, user_id)
     db.delete(user)
     db.commit()
@@ -1,7 +1,7 @@
 """Pydantic schemas for request/response validation."""
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, date, time
 from models import UserRole, TicketPriority, TicketStatus, SLAPriority
 
 
@@ -43,13 +43,24 @@ class UserResponse(UserBase):
 class Token(BaseModel):
     """Token response schema."""
     access_token: str
+    refresh_token: Optional[str] = None
     token_type: str = "bearer"
+    expires_in: Optional[int] = None  # Access token lifetime in seconds
 
 
 class TokenData(BaseModel):
     """Token data schema."""
     user_id: Optional[int] = None
     username: Optional[str] = None
+    role: Optional[UserRole] = None
+    token_version: int = 0
+    expires_at: Optional[datetime] = None
+    token_id: Optional[str] = None  # jti of refresh tokens
+
+
+class RefreshTokenRequest(BaseModel):
+    """Refresh token request schema."""
+    refresh_token: str
 
 
 class LoginRequest(BaseModel):
@@ -79,6 +90,25 @@ class CategoryResponse(CategoryBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Knowledge base suggestion shown alongside tickets and AI analysis
+class KBArticleSuggestion(BaseModel):
+    """Schema for a suggested knowledge base article."""
+    id: int
+    title: str
+    slug: str
+    summary: Optional[str] = None
+    score: float
+
+
+# Open ticket a new ticket was detected as a near-duplicate of
+class TicketDuplicateMatch(BaseModel):
+    """Schema for a near-duplicate parent ticket."""
+    ticket_id: int
+    ticket_number: str
+    similarity: float
+    merged: bool = False
+
+
 # Ticket Schemas
 class TicketBase(BaseModel):
     """Base ticket schema."""
@@ -93,6 +123,31 @@ class TicketCreate(TicketBase):
     pass
 
 
+class TicketImportRow(TicketCreate):
+    """Schema for one historical ticket in a bulk import."""
+    status: TicketStatus = TicketStatus.NEW
+    created_by: Optional[int] = None  # Defaults to the importing user
+    assigned_to: Optional[int] = None
+    created_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+    closed_at: Optional[datetime] = None
+
+
+class TicketImportError(BaseModel):
+    """Schema for a rejected import row."""
+    row: int
+    error: str
+
+
+class TicketImportResult(BaseModel):
+    """Schema for bulk import results."""
+    imported: int
+    failed: int
+    errors: List[TicketImportError] = []
+    elapsed_seconds: float
+    rows_per_second: float
+
+
 class TicketUpdate(BaseModel):
     """Schema for ticket updates."""
     title: Optional[str] = None
@@ -103,6 +158,22 @@ class TicketUpdate(BaseModel):
     assigned_to: Optional[int] = None
 
 
+class TicketBulkUpdate(BaseModel):
+    """Schema for applying the same changes to many tickets."""
+    ticket_ids: List[int] = Field(..., min_length=1)
+    priority: Optional[TicketPriority] = None
+    status: Optional[TicketStatus] = None
+    assigned_to: Optional[int] = None
+
+
+class TicketBulkUpdateResponse(BaseModel):
+    """Schema for bulk ticket update results."""
+    updated: int
+    ticket_ids: List[int]
+    not_found: List[int] = []
+    forbidden: List[int] = []
+
+
 class TicketResponse(TicketBase):
     """Schema for ticket response."""
     id: int
@@ -117,10 +188,20 @@ class TicketResponse(TicketBase):
     creator: Optional[UserResponse] = None
     assignee: Optional[UserResponse] = None
     category: Optional[CategoryResponse] = None
+    suggested_articles: Optional[List[KBArticleSuggestion]] = None  # Only set on creation
+    duplicate_of: Optional[TicketDuplicateMatch] = None  # Only set on creation
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class TicketChangesResponse(BaseModel):
+    """Schema for ticket delta sync results."""
+    tickets: List[TicketResponse] = []  # Created or updated since the watermark, current state
+    deleted: List[int] = []  # Ids of tickets deleted or no longer visible since the watermark
+    watermark: int  # Pass as ``since`` on the next call
+    has_more: bool = False
+
+
 # Comment Schemas
 class CommentBase(BaseModel):
     """Base comment schema."""
@@ -237,6 +318,7 @@ class SLAPolicyBase(BaseModel):
     response_time_hours: float = Field(..., gt=0)
     resolution_time_hours: float = Field(..., gt=0)
     is_active: bool = True
+    calendar_id: Optional[int] = None  # Count hours in this business calendar instead of wall-clock time
 
 
 class SLAPolicyCreate(SLAPolicyBase):
@@ -252,6 +334,7 @@ class SLAPolicyUpdate(BaseModel):
     response_time_hours: Optional[float] = Field(None, gt=0)
     resolution_time_hours: Optional[float] = Field(None, gt=0)
     is_active: Optional[bool] = None
+    calendar_id: Optional[int] = None  # Explicit null switches back to wall-clock hours
 
 
 class SLAPolicyResponse(SLAPolicyBase):
@@ -263,6 +346,78 @@ class SLAPolicyResponse(SLAPolicyBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class SLAAtRiskTicket(BaseModel):
+    """Open ticket with its next SLA deadline."""
+    ticket_id: int
+    ticket_number: str
+    title: str
+    priority: TicketPriority
+    status: TicketStatus
+    assigned_to: Optional[int] = None
+    deadline: str  # "response" or "resolution"
+    due_at: datetime
+    hours_remaining: float  # Negative once breached
+    breached: bool
+
+
+# Business Calendar Schemas
+class BusinessHolidayBase(BaseModel):
+    """Base business holiday schema."""
+    date: date
+    name: Optional[str] = Field(None, max_length=100)
+
+
+class BusinessHolidayResponse(BusinessHolidayBase):
+    """Schema for business holiday response."""
+    id: int
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BusinessCalendarBase(BaseModel):
+    """Base business calendar schema."""
+    name: str = Field(..., max_length=100)
+    description: Optional[str] = None
+    timezone: str = Field("UTC", max_length=64)
+    work_days: List[int] = [0, 1, 2, 3, 4]  # Monday = 0
+    work_start: time = time(9, 0)
+    work_end: time = time(17, 0)
+
+
+class BusinessCalendarCreate(BusinessCalendarBase):
+    """Schema for business calendar creation."""
+    holidays: List[BusinessHolidayBase] = []
+
+
+class BusinessCalendarUpdate(BaseModel):
+    """Schema for business calendar updates."""
+    name: Optional[str] = Field(None, max_length=100)
+    description: Optional[str] = None
+    timezone: Optional[str] = Field(None, max_length=64)
+    work_days: Optional[List[int]] = None
+    work_start: Optional[time] = None
+    work_end: Optional[time] = None
+    holidays: Optional[List[BusinessHolidayBase]] = None  # Replaces all holidays when given
+
+
+class BusinessCalendarResponse(BusinessCalendarBase):
+    """Schema for business calendar response."""
+    id: int
+    holidays: List[BusinessHolidayResponse] = []
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+    @field_validator("work_days", mode="before")
+    @classmethod
+    def split_work_days(cls, value):
+        """Work days are stored as a comma-separated string."""
+        if isinstance(value, str):
+            return [int(day) for day in value.split(",") if day]
+        return value
+
+
 # Search Schema
 class TicketSearchParams(BaseModel):
     """Schema for advanced ticket search parameters."""
@@ -341,10 +496,17 @@ class KBArticleResponse(KBArticleBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     published_at: Optional[datetime] = None
+    snippet: Optional[str] = None  # Highlighted match, only set by searches
 
     model_config = ConfigDict(from_attributes=True)
 
 
+class KBTagCount(BaseModel):
+    """Schema for KB tag facet with article count."""
+    name: str
+    article_count: int
+
+
 # Webhook Schemas
 class WebhookBase(BaseModel):
     """Base webhook schema."""
@@ -410,3 +572,14 @@ class AIAnalysisResponse(BaseModel):
     urgency_score: float
     suggested_tags: List[str]
     confidence: float
+    suggested_articles: List[KBArticleSuggestion] = []
+
+
+class AIBatchAnalysisRequest(BaseModel):
+    """Schema for analyzing many tickets in one request."""
+    items: List[AIAnalysisRequest] = Field(..., min_length=1)
+
+
+class AIBatchAnalysisResponse(BaseModel):
+    """Schema for batch AI analysis results (in request order)."""
+    results: List[AIAnalysisResponse]
@@ -0,0 +1,207 @@
+"""Full-text search indexes backed by SQLite FTS5 or PostgreSQL tsvector."""
+import html
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text, func, literal_column, or_, Integer, Float, String
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from models import Ticket, KnowledgeBaseArticle
+
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Private-use characters delimit highlights until the snippet is HTML-escaped
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_END = "\ue001"
+
+
+class FullTextIndex:
+    """Full-text index over text columns of a table.
+
+    On SQLite an FTS5 external-content table is kept in sync with the
+    source table by triggers. On PostgreSQL a generated ``search_vector``
+    tsvector column with a GIN index is added. Other databases fall back
+    to ``ILIKE`` matching.
+    """
+
+    def __init__(self, model, columns: List[Tuple[str, str, float]], language: str = "english"):
+        # columns: (column name, tsvector weight letter, bm25 weight)
+        self.model = model
+        self.table = model.__tablename__
+        self.fts_table = f"{self.table}_fts"
+        self.columns = columns
+        self.language = language
+        self.backend: Optional[str] = None
+
+    @property
+    def column_names(self) -> List[str]:
+        """Return the indexed column names."""
+        return [name for name, _, _ in self.columns]
+
+    def setup(self, engine: Engine):
+        """Create the index structures if they do not exist."""
+        dialect = engine.dialect.name
+        try:
+            if dialect == "sqlite":
+                self._setup_sqlite(engine)
+            elif dialect == "postgresql":
+                self._setup_postgresql(engine)
+            else:
+                return
+            self.backend = dialect
+        except (OperationalError, ProgrammingError) as e:
+            print(f"Full-text index for {self.table} unavailable, using LIKE search: {str(e)}")
+
+    def _setup_sqlite(self, engine: Engine):
+        """Create the FTS5 table and the triggers that keep it in sync."""
+        fts = self.fts_table
+        cols = ", ".join(self.column_names)
+        new_values = ", ".join(f"new.{name}" for name in self.column_names)
+        old_values = ", ".join(f"old.{name}" for name in self.column_names)
+
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": fts}
+            ).first()
+
+            conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+                f"{cols}, content='{self.table}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {self.table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {self.table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END"
+            ))
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {self.table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+                f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values}); END"
+            ))
+
+            # Index rows that existed before the FTS table was created
+            if not exists:
+                conn.execute(text(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"))
+
+    def _setup_postgresql(self, engine: Engine):
+        """Add a generated tsvector column with a GIN index."""
+        vector = " || ".join(
+            f"setweight(to_tsvector('{self.language}'::regconfig, coalesce({name}, '')), '{weight}')"
+            for name, weight, _ in self.columns
+        )
+
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+                f"GENERATED ALWAYS AS ({vector}) STORED"
+            ))
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_{self.table}_search_vector "
+                f"ON {self.table} USING GIN (search_vector)"
+            ))
+
+    @staticmethod
+    def tokenize(search_text: str) -> List[str]:
+        """Split search text into lowercase terms."""
+        return [term.lower() for term in TOKEN_PATTERN.findall(search_text)]
+
+    def apply(self, query, search_text: str):
+        """Filter a query by search text.
+
+        Returns ``(query, rank)`` where ``rank`` is an ORDER BY clause sorting
+        the best matches first, or None when relevance is not available.
+        Every term is matched as a prefix, so partially typed words match.
+        """
+        query, rank, _ = self.apply_with_snippets(query, search_text)
+        return query, rank
+
+    def apply_with_snippets(self, query, search_text: str, snippet_column: Optional[str] = None):
+        """Filter a query by search text and select highlighted snippets.
+
+        Returns ``(query, rank, snippet)``. When ``snippet_column`` is given
+        and the backend supports it, ``snippet`` has been added to the
+        query's columns and each row is ``(instance, raw_snippet)``; pass
+        the raw value through :meth:`format_snippet`. Otherwise ``snippet``
+        is None and rows are plain instances.
+        """
+        terms = self.tokenize(search_text)
+
+        if terms and self.backend == "sqlite":
+            match = " ".join(f'"{term}"*' for term in terms)
+            weights = ", ".join(str(weight) for _, _, weight in self.columns)
+            snippet_sql = ""
+            columns = {"doc_id": Integer, "rank": Float}
+            if snippet_column:
+                column_index = self.column_names.index(snippet_column)
+                snippet_sql = (
+                    f", snippet({self.fts_table}, {column_index}, "
+                    f"'{HIGHLIGHT_START}', '{HIGHLIGHT_END}', '…', 24) AS snippet"
+                )
+                columns["snippet"] = String
+            hits = text(
+                f"SELECT rowid AS doc_id, bm25({self.fts_table}, {weights}) AS rank{snippet_sql} "
+                f"FROM {self.fts_table} WHERE {self.fts_table} MATCH :match"
+            ).bindparams(match=match).columns(**columns).subquery()
+            query = query.join(hits, hits.c.doc_id == self.model.id)
+            if snippet_column:
+                query = query.add_columns(hits.c.snippet)
+                return query, hits.c.rank.asc(), hits.c.snippet
+            return query, hits.c.rank.asc(), None
+
+        if terms and self.backend == "postgresql":
+            tsquery = func.to_tsquery(self.language, " & ".join(f"{term}:*" for term in terms))
+            vector = literal_column(f"{self.table}.search_vector")
+            query = query.filter(vector.op("@@")(tsquery))
+            if snippet_column:
+                snippet = func.ts_headline(
+                    self.language,
+                    func.coalesce(getattr(self.model, snippet_column), ""),
+                    tsquery,
+                    f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, "
+                    f"MaxWords=35, MinWords=15, MaxFragments=2, FragmentDelimiter=…"
+                )
+                query = query.add_columns(snippet)
+                return query, func.ts_rank_cd(vector, tsquery).desc(), snippet
+            return query, func.ts_rank_cd(vector, tsquery).desc(), None
+
+        search_filter = or_(
+            *[getattr(self.model, name).ilike(f"%{search_text}%") for name in self.column_names]
+        )
+        return query.filter(search_filter), None, None
+
+    @staticmethod
+    def format_snippet(raw_snippet: Optional[str]) -> Optional[str]:
+        """HTML-escape a snippet and wrap highlighted terms in <mark> tags."""
+        if raw_snippet is None:
+            return None
+        escaped = html.escape(raw_snippet)
+        return escaped.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_END, "</mark>")
+
+
+# Ticket search index: ticket numbers and titles rank above descriptions
+ticket_search_index = FullTextIndex(
+    Ticket,
+    columns=[
+        ("ticket_number", "A", 10.0),
+        ("title", "A", 5.0),
+        ("description", "B", 1.0),
+    ]
+)
+
+# Knowledge base search index: titles and tags are boosted over body text
+kb_search_index = FullTextIndex(
+    KnowledgeBaseArticle,
+    columns=[
+        ("title", "A", 10.0),
+        ("tags", "A", 8.0),
+        ("summary", "B", 3.0),
+        ("content", "C", 1.0),
+    ]
+)
@@ -0,0 +1,231 @@
+"""At-risk queue of open tickets ordered by their next SLA deadline."""
+import asyncio
+import heapq
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+from models import Ticket, TicketStatus
+
+
+RESPONSE = "response"
+RESOLUTION = "resolution"
+
+CLOSED_STATUSES = (TicketStatus.RESOLVED, TicketStatus.CLOSED)
+
+# Heap entry: (due date, ticket id, deadline kind)
+Entry = Tuple[datetime, int, str]
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Compare all deadlines as naive UTC, like ``check_sla_breach`` does."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def open_deadlines(status: TicketStatus, first_response_at: Optional[datetime],
+                   response_due: Optional[datetime], resolution_due: Optional[datetime]) -> List[Tuple[str, datetime]]:
+    """SLA deadlines a ticket can still breach."""
+    if status in CLOSED_STATUSES:
+        return []
+    deadlines = []
+    if response_due and not first_response_at:
+        deadlines.append((RESPONSE, naive_utc(response_due)))
+    if resolution_due:
+        deadlines.append((RESOLUTION, naive_utc(resolution_due)))
+    return deadlines
+
+
+class SLAAtRiskIndex:
+    """Min-heaps of open SLA deadlines, kept current as tickets change.
+
+    Deadlines still ahead live in one heap and deadlines already passed
+    in another; each one moves across once, when a query finds it at the
+    top of the upcoming heap. Changes push a fresh entry and leave the
+    old one in place, marked stale by the ``_due`` map, and the heaps are
+    rebuilt once stale entries outnumber live ones. A query walks the
+    heap as a tree from the root with a small frontier heap, so the next
+    ``k`` deadlines cost O(k log n) without popping anything. The index
+    is reloaded every ``refresh_interval`` seconds to pick up changes
+    made by other worker processes; changes tracked while a reload is
+    querying are replayed over its rows, which may predate them.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._due: Dict[Tuple[int, str], datetime] = {}
+        self._upcoming: List[Entry] = []
+        self._breached: List[Entry] = []
+        self._lock = threading.Lock()
+        # Changes tracked during reloads: ticket id -> (version, open deadlines)
+        self._changes: Dict[int, Tuple[int, Dict[str, datetime]]] = {}
+        self._version = 0
+        self._loads = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def load(self, db: Session) -> int:
+        """Rebuild the index from open tickets with SLA deadlines."""
+        with self._lock:
+            self._loads += 1
+            started = self._version
+        try:
+            rows = db.query(
+                Ticket.id, Ticket.status, Ticket.first_response_at, Ticket.sla_response_due, Ticket.sla_resolution_due
+            ).filter(
+                Ticket.status.notin_(CLOSED_STATUSES),
+                or_(Ticket.sla_response_due.isnot(None), Ticket.sla_resolution_due.isnot(None))
+            ).all()
+
+            due = {}
+            for row in rows:
+                for kind, when in open_deadlines(row.status, row.first_response_at,
+                                                 row.sla_response_due, row.sla_resolution_due):
+                    due[(row.id, kind)] = when
+
+            with self._lock:
+                # Changes tracked since the query started are newer than its rows
+                for ticket_id, (version, deadlines) in self._changes.items():
+                    if version > started:
+                        for kind in (RESPONSE, RESOLUTION):
+                            if kind in deadlines:
+                                due[(ticket_id, kind)] = deadlines[kind]
+                            else:
+                                due.pop((ticket_id, kind), None)
+                self._due = due
+                self._rebuild()
+            return len(due)
+        finally:
+            with self._lock:
+                self._loads -= 1
+                if not self._loads:
+                    self._changes.clear()
+
+    def _record(self, ticket_id: int, deadlines: Dict[str, datetime]):
+        """Remember a change for reloads in progress (caller holds the lock)."""
+        if self._loads:
+            self._version += 1
+            self._changes[ticket_id] = (self._version, deadlines)
+
+    def _rebuild(self):
+        """Recreate the heaps from live deadlines (caller holds the lock)."""
+        now = datetime.utcnow()
+        entries = [(when, ticket_id, kind) for (ticket_id, kind), when in self._due.items()]
+        self._upcoming = [entry for entry in entries if entry[0] >= now]
+        self._breached = [entry for entry in entries if entry[0] < now]
+        heapq.heapify(self._upcoming)
+        heapq.heapify(self._breached)
+
+    def _is_live(self, entry: Entry) -> bool:
+        when, ticket_id, kind = entry
+        return self._due.get((ticket_id, kind)) == when
+
+    def update(self, ticket_id: int, status: TicketStatus, first_response_at: Optional[datetime],
+               response_due: Optional[datetime], resolution_due: Optional[datetime]):
+        """Record a ticket's current SLA state."""
+        deadlines = dict(open_deadlines(status, first_response_at, response_due, resolution_due))
+        with self._lock:
+            self._record(ticket_id, deadlines)
+            for kind in (RESPONSE, RESOLUTION):
+                key = (ticket_id, kind)
+                when = deadlines.get(kind)
+                if when is None:
+                    self._due.pop(key, None)
+                elif self._due.get(key) != when:
+                    self._due[key] = when
+                    heapq.heappush(self._upcoming, (when, ticket_id, kind))
+
+            if len(self._upcoming) + len(self._breached) > 2 * len(self._due) + settings.SLA_AT_RISK_COMPACT_SLACK:
+                self._rebuild()
+
+    def track(self, ticket: Ticket):
+        """Record the SLA state of a ticket after it was created or changed."""
+        self.update(ticket.id, ticket.status, ticket.first_response_at,
+                    ticket.sla_response_due, ticket.sla_resolution_due)
+
+    def remove(self, ticket_id: int):
+        """Drop a deleted ticket."""
+        with self._lock:
+            self._record(ticket_id, {})
+            self._due.pop((ticket_id, RESPONSE), None)
+            self._due.pop((ticket_id, RESOLUTION), None)
+
+    def _advance(self, now: datetime):
+        """Move deadlines that have passed to the breached heap (caller holds the lock)."""
+        while self._upcoming and self._upcoming[0][0] < now:
+            entry = heapq.heappop(self._upcoming)
+            if self._is_live(entry):
+                heapq.heappush(self._breached, entry)
+
+    def _walk(self, heap: List[Entry]) -> Iterator[Entry]:
+        """Yield live heap entries in order without modifying the heap."""
+        if not heap:
+            return
+        frontier = [(heap[0], 0)]
+        while frontier:
+            entry, index = heapq.heappop(frontier)
+            if self._is_live(entry):
+                yield entry
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < len(heap):
+                    heapq.heappush(frontier, (heap[child], child))
+
+    def at_risk(self, limit: int, include_breached: bool = False) -> List[Entry]:
+        """Next ``limit`` tickets to breach, each with its earliest open deadline."""
+        results: List[Entry] = []
+        seen = set()
+        with self._lock:
+            self._advance(datetime.utcnow())
+            heaps = (self._breached, self._upcoming) if include_breached else (self._upcoming,)
+            for heap in heaps:
+                for entry in self._walk(heap):
+                    if entry[1] in seen:
+                        continue
+                    seen.add(entry[1])
+                    results.append(entry)
+                    if len(results) >= limit:
+                        return results
+        return results
+
+    def _reload(self):
+        """Reload from the database in a fresh session."""
+        db = SessionLocal()
+        try:
+            self.load(db)
+        except Exception as e:
+            print(f"Failed to reload SLA at-risk index: {str(e)}")
+        finally:
+            db.close()
+
+    async def _run(self):
+        """Reload the index periodically."""
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await asyncio.to_thread(self._reload)
+
+    def start(self):
+        """Start the background reload task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background reload task."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+
+# Global SLA at-risk index
+sla_at_risk_index = SLAAtRiskIndex(refresh_interval=settings.SLA_AT_RISK_REFRESH_SECONDS)
@@ -0,0 +1,112 @@
+"""In-memory registry of active SLA policies and their business calendars."""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session, selectinload
+
+from business_hours import BusinessHours
+from config import settings
+from models import SLAPolicy, SLAPolicyCalendar, BusinessCalendar
+from schemas import SLAPolicyResponse
+
+
+class SLARegistry:
+    """Snapshot of active SLA policies keyed by priority.
+
+    Ticket creation needs the policy for one priority; looking it up here
+    replaces a query per ticket with a dict lookup. Policies with a
+    business calendar count their hours in that calendar's precomputed
+    working intervals. The snapshot is reloaded after ``invalidate``
+    (called when policies or calendars change) or once the TTL expires,
+    so other worker processes pick up changes too.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self._by_priority: Dict[str, SLAPolicyResponse] = {}
+        # Calendar id of every policy (active or not) that has one, for evaluating existing tickets
+        self._policy_calendars: Dict[int, int] = {}
+        self._calendars: Dict[int, BusinessHours] = {}
+        self._snapshot_version = -1
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _is_fresh(self) -> bool:
+        return self._snapshot_version == self.version and time.monotonic() - self._loaded_at < self.ttl
+
+    def load(self, db: Session, force: bool = False):
+        """Reload active policies from the database if the snapshot is stale."""
+        if not force and self._is_fresh():
+            return
+        with self._lock:
+            if not force and self._is_fresh():
+                return
+            version = self.version
+            by_priority: Dict[str, SLAPolicyResponse] = {}
+            # The oldest active policy wins when several share a priority
+            policies = db.query(SLAPolicy).filter(SLAPolicy.is_active == True).order_by(SLAPolicy.id).all()
+            for policy in policies:
+                by_priority.setdefault(policy.priority.value, SLAPolicyResponse.model_validate(policy))
+            policy_calendars = {
+                row.sla_policy_id: row.calendar_id for row in db.query(SLAPolicyCalendar).all()
+            }
+            calendars = {
+                calendar.id: BusinessHours.from_calendar(calendar)
+                for calendar in db.query(BusinessCalendar).options(
+                    selectinload(BusinessCalendar.holidays)
+                ).filter(BusinessCalendar.id.in_(set(policy_calendars.values()))).all()
+            }
+            self._by_priority = by_priority
+            self._policy_calendars = policy_calendars
+            self._calendars = calendars
+            self._snapshot_version = version
+            self._loaded_at = time.monotonic()
+
+    def get(self, db: Session, priority: str) -> Optional[SLAPolicyResponse]:
+        """Return the active policy for a priority value."""
+        self.load(db)
+        return self._by_priority.get(priority)
+
+    def all(self, db: Session) -> List[SLAPolicyResponse]:
+        """Return the active policies."""
+        self.load(db)
+        return list(self._by_priority.values())
+
+    def invalidate(self):
+        """Mark the snapshot stale after policies change."""
+        with self._lock:
+            self.version += 1
+
+    def calendar_for(self, db: Session, policy_id: Optional[int]) -> Optional[BusinessHours]:
+        """Business hours a policy counts in, or None for wall-clock hours."""
+        self.load(db)
+        return self._calendars.get(self._policy_calendars.get(policy_id))
+
+    def due_dates(self, policy: SLAPolicyResponse, start: datetime) -> Tuple[datetime, datetime]:
+        """Response and resolution deadlines for a ticket opened at ``start``."""
+        calendar = self._calendars.get(policy.calendar_id)
+        if calendar is not None:
+            response_due, resolution_due = calendar.add_hours(
+                [start, start], [policy.response_time_hours, policy.resolution_time_hours]
+            )
+            return response_due, resolution_due
+        return (
+            start + timedelta(hours=policy.response_time_hours),
+            start + timedelta(hours=policy.resolution_time_hours),
+        )
+
+    def elapsed_hours(self, db: Session, policy_id: Optional[int],
+                      starts: Sequence[datetime], ends: Sequence[datetime]) -> np.ndarray:
+        """Hours between paired timestamps, in the policy's business time when it has a calendar."""
+        calendar = self.calendar_for(db, policy_id)
+        if calendar is not None:
+            return calendar.elapsed_hours(starts, ends)
+        return np.array([(end - start).total_seconds() / 3600 for start, end in zip(starts, ends)])
+
+
+# Global SLA registry instance
+sla_registry = SLARegistry(ttl=settings.SLA_CACHE_TTL)
@@ -0,0 +1,36 @@
+"""Tests for business-time arithmetic."""
+from datetime import datetime, time, timedelta
+
+from business_hours import BusinessHours
+
+
+def weekday_calendar():
+    return BusinessHours("UTC", range(5), time(9), time(17))
+
+
+def test_elapsed_hours_spanning_beyond_the_table():
+    calendar = weekday_calendar()
+    start, end = datetime(2020, 1, 6, 9), datetime(2026, 10, 19, 12)
+    weekdays = (end.date() - start.date()).days // 7 * 5
+
+    assert calendar.elapsed_hours(start, end) == weekdays * 8 + 3
+    assert calendar.elapsed_hours(start, end) == weekdays * 8 + 3
+
+
+def test_earlier_extension_keeps_results_consistent():
+    calendar = weekday_calendar()
+    start, end = datetime(2026, 10, 19, 9), datetime(2026, 10, 20, 12)
+    assert calendar.elapsed_hours(start, end) == 11
+
+    calendar.elapsed_hours(datetime(2010, 1, 4, 9), datetime(2010, 1, 5, 9))
+    assert calendar.elapsed_hours(start, end) == 11
+    assert calendar.elapsed_hours([start, datetime(2012, 3, 5, 9)], [end, datetime(2012, 3, 5, 10)]).tolist() == [11, 1]
+
+
+def test_add_hours_round_trips_far_past_starts():
+    calendar = weekday_calendar()
+    start = datetime(2015, 6, 1, 16)
+    deadline = calendar.add_hours(start, 4)
+
+    assert deadline == start + timedelta(days=1, hours=-4)
+    assert calendar.elapsed_hours(start, deadline) == 4
@@ -0,0 +1,41 @@
+"""Tests for MinHash near-duplicate detection."""
+import random
+
+import pytest
+
+from duplicate_detector import minhash, shingles, similarity
+
+
+def jaccard(first, second):
+    first, second = shingles(*first), shingles(*second)
+    return len(first & second) / len(first | second)
+
+
+def test_unrelated_tickets_are_not_similar():
+    vpn = ("Cannot connect to VPN", "The VPN client times out since this morning, please help me with this")
+    printer = ("Printer crashes when printing", "The office printer crashes on every job, please help me with this")
+
+    assert jaccard(vpn, printer) < 0.1
+    assert similarity(minhash(*vpn), minhash(*printer)) < 0.25
+
+
+@pytest.mark.parametrize("shared", [0, 10, 25, 40, 60])
+def test_estimate_tracks_jaccard(shared):
+    rng = random.Random(shared)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    errors = []
+    for _ in range(20):
+        words = rng.sample(vocabulary, 160 - shared)
+        common, first_only, second_only = words[:shared], words[shared:80], words[80:160 - shared]
+        first = ("", " ".join(common + first_only))
+        second = ("", " ".join(common + second_only))
+        errors.append(similarity(minhash(*first), minhash(*second)) - jaccard(first, second))
+
+    # 64 permutations: standard error <= 0.0625 per pair, much less on the mean
+    assert abs(sum(errors) / len(errors)) < 0.05
+    assert max(abs(error) for error in errors) < 0.25
+
+
+def test_identical_text_has_full_similarity():
+    ticket = ("Outlook crashes", "Outlook crashes when opening attachments")
+    assert similarity(minhash(*ticket), minhash(*ticket)) == 1.0
@@ -0,0 +1,43 @@
+"""Tests for the single-pass keyword matcher."""
+import pytest
+
+from keyword_matcher import KeywordMatcher, stem
+from ai_categorization import ai_service
+
+
+@pytest.mark.parametrize("words", [
+    ("crash", "crashes", "crashed", "crashing"),
+    ("switch", "switches"),
+    ("install", "installed", "installing", "installs"),
+    ("update", "updates", "updated", "updating"),
+    ("policy", "policies"),
+    ("log", "logging", "logs"),
+    ("access", "accessed"),
+    ("virus", "viruses"),
+])
+def test_stem_merges_inflections(words):
+    assert len({stem(word) for word in words}) == 1
+
+
+@pytest.mark.parametrize("text, group, label", [
+    ("Outlook crashes", "category", "Software"),
+    ("Outlook crashes", "tag", "crash"),
+    ("Excel crashed", "tag", "crash"),
+    ("App keeps crashing", "category", "Software"),
+    ("App keeps crashing", "tag", "crash"),
+    ("Switches are failing", "category", "Network"),
+    ("installed drivers", "category", "Software"),
+])
+def test_inflected_words_match_keywords(text, group, label):
+    assert label in ai_service.matcher.match(text)[group]
+
+
+def test_keywords_match_whole_words():
+    matcher = KeywordMatcher({"category": {"Network": ["ip"]}})
+    assert not matcher.match("send me the zip file")["category"]
+    assert matcher.match("What is my IP address?")["category"]["Network"] == {"ip"}
+
+
+def test_multi_word_keywords_match_inflected_phrases():
+    matcher = KeywordMatcher({"urgency": {"urgency": ["not working"]}})
+    assert matcher.match("Printers are not working")["urgency"]["urgency"] == {"not work"}
@@ -0,0 +1,22 @@
+"""Tests for the learned ticket classifier."""
+from ticket_classifier import LinearHead, TicketClassifier, vectorize, ticket_text
+
+
+def make_classifier(tmp_path, heads):
+    classifier = TicketClassifier(str(tmp_path / "model.npz"), n_features=1024)
+    classifier.heads = heads
+    return classifier
+
+
+def test_single_class_head_is_not_used(tmp_path):
+    texts = [("Production down", "Nothing works"), ("Printer jam", "Paper stuck")]
+    batch = vectorize([ticket_text(title, description) for title, description in texts], 1024)
+    priority = LinearHead([], 1024)
+    priority.partial_fit(batch, ["medium", "medium"])
+    category = LinearHead([], 1024)
+    category.partial_fit(batch, [1, 2])
+
+    predictions = make_classifier(tmp_path, {"priority": priority, "category": category}).predict_batch(texts)
+
+    assert all("priority" not in prediction for prediction in predictions)
+    assert [prediction["category"][0] for prediction in predictions] == [1, 2]
@@ -0,0 +1,114 @@
+"""Append-only ticket change log behind delta sync (``GET /api/tickets/changes``).
+
+Clients advance a watermark over ``seq``, which relies on changes becoming
+visible in ``seq`` order. SQLite has a single writer, so that holds. On
+databases with concurrent writers (e.g. PostgreSQL) a transaction can take
+a sequence number and commit after a later one has been read, and clients
+would skip its change; there, pair delta sync with a periodic full re-fetch.
+"""
+from datetime import datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from config import settings
+from models import Ticket, TicketChange, User, UserRole
+
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+
+# (ticket id, creator id, assignee id)
+ChangedTicket = Tuple[int, Optional[int], Optional[int]]
+
+
+def record_change(db: Session, ticket: Ticket, change_type: str, previous_assignee: Optional[int] = None):
+    """Log a change to one ticket; committed with the caller's transaction.
+
+    A ticket reassigned away from ``previous_assignee`` is logged for them
+    too, so their next sync learns they lost access.
+    """
+    db.add(TicketChange(
+        ticket_id=ticket.id,
+        change_type=change_type,
+        created_by=ticket.created_by,
+        assigned_to=ticket.assigned_to
+    ))
+    if previous_assignee is not None and previous_assignee != ticket.assigned_to:
+        db.add(TicketChange(
+            ticket_id=ticket.id,
+            change_type=change_type,
+            created_by=ticket.created_by,
+            assigned_to=previous_assignee
+        ))
+
+
+def record_changes(db: Session, tickets: Iterable[ChangedTicket], change_type: str):
+    """Log a change to many tickets with one executemany INSERT."""
+    rows = [
+        {"ticket_id": ticket_id, "change_type": change_type, "created_by": created_by, "assigned_to": assigned_to}
+        for ticket_id, created_by, assigned_to in tickets
+    ]
+    if rows:
+        db.execute(TicketChange.__table__.insert(), rows)
+
+
+def current_watermark(db: Session) -> int:
+    """Sequence number of the latest change (0 before the first one)."""
+    return db.query(func.max(TicketChange.seq)).scalar() or 0
+
+
+def is_expired(db: Session, since: int) -> bool:
+    """Whether changes after ``since`` may have been pruned from the log."""
+    oldest = db.query(func.min(TicketChange.seq)).scalar()
+    return oldest is not None and since < oldest - 1
+
+
+def changes_since(db: Session, since: int, limit: int, user: User) -> Tuple[List[Tuple[int, str]], int, bool]:
+    """Latest change per ticket after ``since`` that involved the user, in log order.
+
+    Returns ([(ticket id, change type)], new watermark, has more). Tickets
+    changed several times appear once, with their last change, so the work
+    is proportional to the changes since the watermark. Visibility is that
+    of the time of each change; callers re-check it against current state.
+    Once caught up, the watermark is the head of the whole log, so users
+    who see few tickets don't rescan everyone else's changes every poll.
+    """
+    # Read before the query: changes logged in between are picked up next time
+    head = current_watermark(db)
+    latest = db.query(
+        TicketChange.ticket_id, func.max(TicketChange.seq).label("seq")
+    ).filter(TicketChange.seq > since)
+
+    if user.role == UserRole.USER:
+        latest = latest.filter(or_(
+            TicketChange.created_by == user.id,
+            TicketChange.assigned_to == user.id
+        ))
+
+    latest = latest.group_by(TicketChange.ticket_id).order_by(func.max(TicketChange.seq)).limit(limit + 1).subquery()
+
+    rows = db.query(latest.c.ticket_id, latest.c.seq, TicketChange.change_type).join(
+        TicketChange, TicketChange.seq == latest.c.seq
+    ).order_by(latest.c.seq).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more:
+        watermark = rows[-1].seq
+    else:
+        watermark = max(head, rows[-1].seq if rows else since)
+    return [(row.ticket_id, row.change_type) for row in rows], watermark, has_more
+
+
+def prune(db: Session) -> int:
+    """Delete changes older than the retention period, always keeping the latest."""
+    cutoff = datetime.utcnow() - timedelta(days=settings.TICKET_CHANGE_RETENTION_DAYS)
+    deleted = db.query(TicketChange).filter(
+        TicketChange.changed_at < cutoff,
+        TicketChange.seq < current_watermark(db)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -0,0 +1,373 @@
+"""Learned ticket classifier trained from historical tickets.
+
+Tickets are represented as hashed word unigram/bigram features and
+classified by softmax regression heads (one for category, one for
+priority) trained with mini-batch SGD in NumPy. The model is stored as a
+compressed ``.npz`` file and can be retrained incrementally:
+
+    python ticket_classifier.py train            # new and edited tickets since last run
+    python ticket_classifier.py train --full     # retrain from scratch
+    python ticket_classifier.py benchmark        # predictions per second
+"""
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from config import settings
+from keyword_matcher import tokenize
+from models import Ticket, TicketPriority
+
+
+BIAS_FEATURE = "__bias__"
+
+# Sparse batch of documents in CSR layout: (indices, values, indptr)
+SparseBatch = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+# Predictions for one ticket: head -> (label, probability)
+Prediction = Dict[str, Tuple[object, float]]
+
+
+def extract_features(text: str, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Hash word unigrams and bigrams into a sparse, L2-normalized vector."""
+    tokens = tokenize(text)
+    grams = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    counts = Counter(zlib.crc32(gram.encode()) % n_features for gram in grams)
+    counts[zlib.crc32(BIAS_FEATURE.encode()) % n_features] += 1
+
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+    values /= np.linalg.norm(values)
+    return indices, values.astype(np.float32)
+
+
+def vectorize(texts: Sequence[str], n_features: int) -> SparseBatch:
+    """Build a sparse CSR batch from many texts."""
+    features = [extract_features(text, n_features) for text in texts]
+    indptr = np.zeros(len(features) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(indices) for indices, _ in features])
+    indices = np.concatenate([indices for indices, _ in features]) if features else np.zeros(0, np.int64)
+    values = np.concatenate([values for _, values in features]) if features else np.zeros(0, np.float32)
+    return indices, values, indptr
+
+
+def ticket_text(title: str, description: str) -> str:
+    """Combine ticket fields into the classifier input text."""
+    return f"{title} {title} {description}"
+
+
+class LinearHead:
+    """Softmax regression over hashed sparse features."""
+
+    def __init__(self, classes: List, n_features: int, weights: Optional[np.ndarray] = None):
+        self.classes = list(classes)
+        self.weights = (
+            weights if weights is not None
+            else np.zeros((n_features, len(self.classes)), dtype=np.float32)
+        )
+
+    def add_classes(self, classes: Sequence):
+        """Add output columns for labels not seen before."""
+        new_classes = [label for label in classes if label not in self.classes]
+        if new_classes:
+            self.classes.extend(new_classes)
+            extra = np.zeros((self.weights.shape[0], len(new_classes)), dtype=np.float32)
+            self.weights = np.hstack([self.weights, extra])
+
+    def logits(self, batch: SparseBatch) -> np.ndarray:
+        """Compute class scores for a sparse batch."""
+        indices, values, indptr = batch
+        contributions = self.weights[indices] * values[:, None]
+        # Every document has the bias feature, so no row is empty
+        return np.add.reduceat(contributions, indptr[:-1], axis=0)
+
+    @staticmethod
+    def softmax(logits: np.ndarray) -> np.ndarray:
+        """Row-wise softmax."""
+        shifted = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(shifted)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict_proba(self, batch: SparseBatch) -> np.ndarray:
+        """Class probabilities for a sparse batch."""
+        return self.softmax(self.logits(batch))
+
+    def partial_fit(
+        self,
+        batch: SparseBatch,
+        labels: Sequence,
+        epochs: int = 5,
+        learning_rate: float = 0.5,
+        l2: float = 1e-6,
+        batch_size: int = 256,
+        seed: int = 0
+    ):
+        """Continue training with mini-batch SGD on cross-entropy loss."""
+        self.add_classes(sorted(set(labels), key=str))
+        class_index = {label: i for i, label in enumerate(self.classes)}
+        targets = np.array([class_index[label] for label in labels], dtype=np.int64)
+        indices, values, indptr = batch
+        n_docs = len(targets)
+        rng = np.random.default_rng(seed)
+
+        for epoch in range(epochs):
+            rate = learning_rate / math.sqrt(epoch + 1)
+            order = rng.permutation(n_docs)
+            for start in range(0, n_docs, batch_size):
+                docs = order[start:start + batch_size]
+                starts, ends = indptr[docs], indptr[docs + 1]
+                lengths = ends - starts
+                positions = np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)])
+                rows = np.repeat(np.arange(len(docs)), lengths)
+                mini_indices = indices[positions]
+                mini_values = values[positions]
+                mini_indptr = np.concatenate([[0], np.cumsum(lengths)])
+
+                probs = self.predict_proba((mini_indices, mini_values, mini_indptr))
+                probs[np.arange(len(docs)), targets[docs]] -= 1.0
+                gradient = mini_values[:, None] * probs[rows] / len(docs)
+                if l2:
+                    gradient += l2 * self.weights[mini_indices]
+                np.add.at(self.weights, mini_indices, -rate * gradient)
+
+
+class TicketClassifier:
+    """Category and priority classifier persisted as a compact model file."""
+
+    HEADS = ("category", "priority")
+
+    def __init__(self, model_path: str, n_features: int):
+        self.model_path = model_path
+        self.n_features = n_features
+        self.heads: Dict[str, LinearHead] = {}
+        self.meta: Dict = {}
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """Whether a trained model is loaded."""
+        self._reload_if_changed()
+        return bool(self.heads)
+
+    @property
+    def version(self) -> str:
+        """Identifier of the loaded model, changing whenever it is retrained."""
+        return str(self.meta.get("trained_at", "none"))
+
+    def load(self, path: Optional[str] = None) -> bool:
+        """Load the model file if it exists."""
+        path = path or self.model_path
+        if not os.path.exists(path):
+            return False
+
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data["meta"]))
+            heads = {}
+            for head in self.HEADS:
+                if f"{head}_weights" not in data:
+                    continue
+                classes = data[f"{head}_classes"].tolist()
+                weights = data[f"{head}_weights"].astype(np.float32)
+                heads[head] = LinearHead(classes, meta["n_features"], weights)
+
+        with self._lock:
+            self.heads = heads
+            self.meta = meta
+            self.n_features = meta["n_features"]
+            self._mtime = os.path.getmtime(path)
+        return True
+
+    def _reload_if_changed(self):
+        """Pick up a model file rewritten by the training command."""
+        now = time.monotonic()
+        if now - self._checked_at < 30:
+            return
+        self._checked_at = now
+        try:
+            mtime = os.path.getmtime(self.model_path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            try:
+                self.load()
+                print(f"🧠 Reloaded ticket classifier ({self.version})")
+            except Exception as e:
+                print(f"Failed to reload ticket classifier: {str(e)}")
+
+    def save(self, path: Optional[str] = None):
+        """Write the model to a compressed .npz file (weights stored as float16)."""
+        path = path or self.model_path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        arrays = {"meta": np.array(json.dumps(self.meta))}
+        for head, model in self.heads.items():
+            arrays[f"{head}_classes"] = np.array(model.classes)
+            arrays[f"{head}_weights"] = model.weights.astype(np.float16)
+
+        tmp_path = f"{path}.tmp.npz"
+        np.savez_compressed(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def predict_batch(self, items: Sequence[Tuple[str, str]]) -> List[Prediction]:
+        """Predict (label, probability) per head for many (title, description) pairs."""
+        heads = self.heads
+        if not heads or not items:
+            return [{} for _ in items]
+
+        batch = vectorize([ticket_text(title, description) for title, description in items], self.n_features)
+        results: List[Prediction] = [{} for _ in items]
+        for head, model in heads.items():
+            # A single-class head always predicts with probability 1.0
+            if len(model.classes) < 2:
+                continue
+            probs = model.predict_proba(batch)
+            best = probs.argmax(axis=1)
+            for i, class_id in enumerate(best):
+                label = model.classes[class_id]
+                if head == "priority":
+                    label = TicketPriority(label)
+                results[i][head] = (label, float(probs[i, class_id]))
+        return results
+
+    def predict(self, title: str, description: str) -> Prediction:
+        """Predict (label, probability) per head for one ticket."""
+        return self.predict_batch([(title, description)])[0]
+
+    def train(self, db: Session, full: bool = False, epochs: int = 5) -> Dict:
+        """Fit the model on tickets, incrementally unless ``full``.
+
+        Incremental runs train on tickets created or edited since the last
+        run, so recategorized tickets add evidence for their new label. The
+        old label is not unlearned; a ``--full`` retrain does that.
+        """
+        if full or not self.heads:
+            self.heads = {head: LinearHead([], self.n_features) for head in self.HEADS}
+            self.meta = {"n_features": self.n_features, "last_ticket_id": 0, "trained_tickets": 0}
+
+        last_ticket_id = self.meta.get("last_ticket_id", 0)
+        started_at = datetime.utcnow()
+        query = db.query(
+            Ticket.id, Ticket.title, Ticket.description, Ticket.category_id, Ticket.priority, Ticket.updated_at
+        )
+        if self.meta.get("last_updated_at"):
+            last_updated_at = datetime.fromisoformat(self.meta["last_updated_at"])
+            query = query.filter(or_(Ticket.id > last_ticket_id, Ticket.updated_at > last_updated_at))
+        else:
+            query = query.filter(Ticket.id > last_ticket_id)
+        rows = query.order_by(Ticket.id).all()
+
+        if not rows:
+            return {"tickets": 0}
+
+        batch = vectorize([ticket_text(row.title, row.description) for row in rows], self.n_features)
+        self.heads["priority"].partial_fit(batch, [row.priority.value for row in rows], epochs=epochs)
+
+        # Only tickets with a category train the category head
+        categorized = [i for i, row in enumerate(rows) if row.category_id is not None]
+        if categorized:
+            category_batch = vectorize(
+                [ticket_text(rows[i].title, rows[i].description) for i in categorized], self.n_features
+            )
+            self.heads["category"].partial_fit(
+                category_batch, [rows[i].category_id for i in categorized], epochs=epochs
+            )
+
+        updated = [row.updated_at for row in rows if row.updated_at is not None]
+        if updated:
+            self.meta["last_updated_at"] = max(updated).isoformat()
+        elif not self.meta.get("last_updated_at"):
+            self.meta["last_updated_at"] = started_at.isoformat()
+        self.meta.update({
+            "last_ticket_id": max(rows[-1].id, last_ticket_id),
+            "trained_tickets": self.meta.get("trained_tickets", 0) + len(rows),
+            "trained_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        })
+        return {"tickets": len(rows), "categorized": len(categorized)}
+
+
+# Global ticket classifier instance
+ticket_classifier = TicketClassifier(settings.CLASSIFIER_MODEL_PATH, settings.CLASSIFIER_FEATURES)
+
+
+def benchmark(repeat: int = 2000, batch_size: int = 256):
+    """Measure single and batched predictions per second with the loaded model."""
+    if not ticket_classifier.load():
+        print(f"No model found at {ticket_classifier.model_path}; run 'train' first")
+        return
+
+    title = "Outlook crashes when opening attachments"
+    description = (
+        "Since this morning Outlook freezes and then crashes whenever I open a PDF "
+        "attachment. I already restarted the laptop and the VPN is connected."
+    )
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        ticket_classifier.predict(title, description)
+    single = repeat / (time.perf_counter() - start)
+
+    items = [(title, description)] * batch_size
+    rounds = max(1, repeat // batch_size)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        ticket_classifier.predict_batch(items)
+    batched = rounds * batch_size / (time.perf_counter() - start)
+
+    print(f"Model: {ticket_classifier.version}, {ticket_classifier.n_features} hashed features")
+    print(f"Single predictions: {single:,.0f}/sec")
+    print(f"Batched predictions (batch of {batch_size}): {batched:,.0f}/sec")
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Train or benchmark the ticket classifier.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train_parser = subparsers.add_parser(
+        "train",
+        help="Train on tickets created or edited since the last run (use --full to drop outdated labels)"
+    )
+    train_parser.add_argument("--full", action="store_true", help="Retrain from scratch on all tickets")
+    train_parser.add_argument("--epochs", type=int, default=5, help="SGD epochs over the new and edited tickets")
+    subparsers.add_parser("benchmark", help="Measure predictions per second")
+    args = parser.parse_args()
+
+    if args.command == "benchmark":
+        benchmark()
+        return
+
+    if not args.full:
+        ticket_classifier.load()
+
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        stats = ticket_classifier.train(db, full=args.full, epochs=args.epochs)
+    finally:
+        db.close()
+
+    if not stats["tickets"]:
+        print("No new or edited tickets to train on")
+        return
+
+    ticket_classifier.save()
+    print(
+        f"Trained on {stats['tickets']} tickets ({stats['categorized']} categorized) "
+        f"in {time.perf_counter() - start:.1f}s; model saved to {ticket_classifier.model_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""Bulk import of historical tickets from CSV or NDJSON.
+
+Rows are streamed, validated with ``TicketImportRow`` and inserted in
+large executemany batches with preallocated ticket numbers and SLA due
+dates resolved from the in-memory SLA registry:
+
+    python ticket_import.py tickets.csv
+    python ticket_import.py tickets.ndjson --user admin --batch-size 5000
+"""
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from category_directory import category_directory
+from config import settings
+from models import Ticket, User
+from sla_registry import sla_registry
+from sla_at_risk import sla_at_risk_index
+import ticket_changes
+from schemas import TicketImportRow
+
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+# Raw row: (row number, parsed fields or None, parse error or None)
+RawRow = Tuple[int, Optional[Dict], Optional[str]]
+
+
+def detect_format(filename: Optional[str]) -> str:
+    """Guess the import format from a file name (defaults to CSV)."""
+    name = (filename or "").lower()
+    return "ndjson" if name.endswith((".ndjson", ".jsonl", ".json")) else "csv"
+
+
+def iter_rows(stream: TextIO, fmt: str) -> Iterator[RawRow]:
+    """Stream rows from a CSV (with header) or NDJSON text stream."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row_number, row in enumerate(reader, start=2):  # Row 1 is the header
+            # Empty cells mean "not given" so schema defaults apply
+            yield row_number, {key: value for key, value in row.items() if key and value not in ("", None)}, None
+        return
+
+    for row_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(data, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield row_number, data, None
+
+
+def format_validation_error(error: ValidationError) -> str:
+    """Flatten a pydantic validation error into one line."""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+class TicketImporter:
+    """Validates and inserts imported tickets in batches.
+
+    Everything a row needs besides its own fields (ticket numbers, known
+    users, categories and SLA policies) is loaded once up front, so each
+    batch costs a single executemany INSERT and a commit.
+    """
+
+    def __init__(self, db: Session, default_user_id: int, batch_size: Optional[int] = None):
+        self.db = db
+        self.default_user_id = default_user_id
+        self.batch_size = batch_size or settings.IMPORT_BATCH_SIZE
+        self.max_errors = settings.IMPORT_MAX_ERRORS
+
+        self.user_ids = {row.id for row in db.query(User.id).all()}
+        sla_registry.load(db)
+        self._next_number = self._next_ticket_number()
+
+    def _next_ticket_number(self) -> int:
+        """Next free ticket number, using the same scheme as ``generate_ticket_number``."""
+        latest = self.db.query(Ticket.ticket_number).order_by(Ticket.id.desc()).first()
+        if not latest:
+            return 1
+        try:
+            return int(latest.ticket_number.split("-")[1]) + 1
+        except (IndexError, ValueError):
+            return 1
+
+    def _allocate_numbers(self, count: int) -> List[str]:
+        """Reserve a block of consecutive ticket numbers."""
+        # Tickets created through the API since the last batch move the counter on
+        start = max(self._next_number, self._next_ticket_number())
+        self._next_number = start + count
+        return [f"TKT-{number:05d}" for number in range(start, start + count)]
+
+    def _build_values(self, row: TicketImportRow, now: datetime) -> Dict:
+        """Convert a validated row into column values for the INSERT."""
+        created_by = row.created_by or self.default_user_id
+        if created_by not in self.user_ids:
+            raise ValueError(f"created_by: user {created_by} does not exist")
+        if row.assigned_to is not None and row.assigned_to not in self.user_ids:
+            raise ValueError(f"assigned_to: user {row.assigned_to} does not exist")
+        if row.category_id is not None and category_directory.get(self.db, row.category_id) is None:
+            raise ValueError(f"category_id: category {row.category_id} does not exist")
+
+        created_at = row.created_at or now
+        values = {
+            "title": row.title,
+            "description": row.description,
+            "priority": row.priority,
+            "status": row.status,
+            "category_id": row.category_id,
+            "created_by": created_by,
+            "assigned_to": row.assigned_to,
+            "created_at": created_at,
+            "resolved_at": row.resolved_at,
+            "closed_at": row.closed_at,
+            "sla_policy_id": None,
+            "sla_response_due": None,
+            "sla_resolution_due": None,
+        }
+
+        policy = sla_registry.get(self.db, row.priority.value)
+        if policy:
+            values["sla_policy_id"] = policy.id
+            values["sla_response_due"], values["sla_resolution_due"] = sla_registry.due_dates(policy, created_at)
+        return values
+
+    def _flush(self, batch: List[Dict]):
+        """Insert one batch with preallocated ticket numbers."""
+        for values, number in zip(batch, self._allocate_numbers(len(batch))):
+            values["ticket_number"] = number
+        # Core insert: the ORM bulk path drops None values, which splits
+        # rows with different missing columns into separate statements
+        self.db.execute(Ticket.__table__.insert(), batch)
+
+        # Ids of the new rows, for the change log and the at-risk index
+        rows = self.db.query(
+            Ticket.id, Ticket.created_by, Ticket.assigned_to, Ticket.status,
+            Ticket.first_response_at, Ticket.sla_response_due, Ticket.sla_resolution_due
+        ).filter(Ticket.ticket_number.in_([values["ticket_number"] for values in batch])).all()
+        ticket_changes.record_changes(
+            self.db, ((row.id, row.created_by, row.assigned_to) for row in rows), ticket_changes.CREATED
+        )
+        self.db.commit()
+
+        for row in rows:
+            sla_at_risk_index.update(
+                row.id, row.status, row.first_response_at, row.sla_response_due, row.sla_resolution_due
+            )
+
+    def run(self, rows: Iterable[RawRow], progress: bool = False) -> Dict:
+        """Import rows and return counts, row-level errors and throughput."""
+        start = time.perf_counter()
+        now = datetime.utcnow()
+        imported = failed = 0
+        errors: List[Dict] = []
+        batch: List[Dict] = []
+
+        def reject(row_number: int, message: str):
+            nonlocal failed
+            failed += 1
+            if len(errors) < self.max_errors:
+                errors.append({"row": row_number, "error": message})
+
+        for row_number, data, parse_error in rows:
+            if parse_error:
+                reject(row_number, parse_error)
+                continue
+            try:
+                batch.append(self._build_values(TicketImportRow.model_validate(data), now))
+            except ValidationError as e:
+                reject(row_number, format_validation_error(e))
+                continue
+            except ValueError as e:
+                reject(row_number, str(e))
+                continue
+
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                imported += len(batch)
+                batch = []
+                if progress:
+                    print(f"  {imported} tickets imported ({imported / (time.perf_counter() - start):.0f}/s)")
+
+        if batch:
+            self._flush(batch)
+            imported += len(batch)
+
+        elapsed = time.perf_counter() - start
+        return {
+            "imported": imported,
+            "failed": failed,
+            "errors": errors,
+            "elapsed_seconds": round(elapsed, 3),
+            "rows_per_second": round((imported + failed) / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def import_file(db: Session, stream: TextIO, fmt: str, default_user_id: int, **kwargs) -> Dict:
+    """Import tickets from a text stream."""
+    return TicketImporter(db, default_user_id, **kwargs).run(iter_rows(stream, fmt))
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+    from database import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Import historical tickets from CSV or NDJSON.")
+    parser.add_argument("path", help="CSV (with header row) or NDJSON file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="File format (guessed from the extension)")
+    parser.add_argument("--user", default=settings.ADMIN_USERNAME, help="Username recorded as creator by default")
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE, help="Rows per INSERT batch")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.username == args.user).first()
+        if not user:
+            parser.error(f"User '{args.user}' not found")
+
+        fmt = args.format or detect_format(args.path)
+        with io.open(args.path, encoding="utf-8-sig", newline="") as stream:
+            report = TicketImporter(db, user.id, batch_size=args.batch_size).run(
+                iter_rows(stream, fmt), progress=True
+            )
+    finally:
+        db.close()
+
+    for error in report["errors"]:
+        print(f"Row {error['row']}: {error['error']}")
+    print(
+        f"Imported {report['imported']} tickets, {report['failed']} rows failed, "
+        f"in {report['elapsed_seconds']:.1f}s ({report['rows_per_second']:.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Per-user token versions used to revoke issued JWTs."""
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from database import SessionLocal
+from models import UserTokenVersion
+
+
+class TokenVersionMap:
+    """In-memory map of user id -> current token version.
+
+    Every token carries the version that was current when it was issued.
+    Revoking a user's tokens bumps the version, so older tokens fail
+    ``is_current`` without any per-request database lookup. Only users
+    whose tokens were ever revoked have a row, which keeps the map small.
+    The map is reloaded periodically so revocations made by other worker
+    processes take effect within ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, refresh_interval: float):
+        self.refresh_interval = refresh_interval
+        self._versions: Dict[int, int] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> int:
+        """Load all stored token versions."""
+        versions = {row.user_id: row.version for row in db.query(UserTokenVersion).all()}
+        with self._lock:
+            self._versions = versions
+            self._loaded_at = time.monotonic()
+        return len(versions)
+
+    def _reload_if_stale(self):
+        """Pick up revocations made by other worker processes."""
+        if time.monotonic() - self._loaded_at < self.refresh_interval:
+            return
+        db = SessionLocal()
+        try:
+            self.load(db)
+        except Exception as e:
+            print(f"Failed to reload token versions: {str(e)}")
+            self._loaded_at = time.monotonic()
+        finally:
+            db.close()
+
+    def current(self, user_id: int) -> int:
+        """Return the version new tokens for a user are issued with."""
+        self._reload_if_stale()
+        return self._versions.get(user_id, 0)
+
+    def is_current(self, user_id: int, version: int) -> bool:
+        """Check that a token's version has not been revoked."""
+        # A newer version can only come from another worker we have not reloaded yet
+        return version >= self.current(user_id)
+
+    def stored_version(self, db: Session, user_id: int) -> int:
+        """Read a user's token version from the database (for refresh, off the hot path)."""
+        row = db.query(UserTokenVersion).filter(UserTokenVersion.user_id == user_id).first()
+        version = row.version if row else 0
+        with self._lock:
+            self._versions[user_id] = version
+        return version
+
+    def revoke(self, db: Session, user_id: int) -> int:
+        """Revoke every token issued to a user so far."""
+        row = db.query(UserTokenVersion).filter(UserTokenVersion.user_id == user_id).first()
+        if row is None:
+            row = UserTokenVersion(user_id=user_id, version=0)
+            db.add(row)
+        row.version = (row.version or 0) + 1
+        db.commit()
+
+        with self._lock:
+            self._versions[user_id] = row.version
+        return row.version
+
+
+# Global token version map
+token_versions = TokenVersionMap(refresh_interval=settings.TOKEN_VERSION_REFRESH_SECONDS)
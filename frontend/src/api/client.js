@@ -23,15 +23,65 @@ apiClient.interceptors.request.use(
   }
 );
 
+// Single in-flight refresh shared by all requests that failed with 401
+let refreshPromise = null;
+
+const refreshAccessToken = () => {
+  if (!refreshPromise) {
+    const refreshToken = localStorage.getItem('refreshToken');
+    refreshPromise = axios
+      .post(`${API_BASE_URL}/api/auth/refresh`, { refresh_token: refreshToken })
+      .then((response) => {
+        localStorage.setItem('token', response.data.access_token);
+        localStorage.setItem('refreshToken', response.data.refresh_token);
+        return response.data.access_token;
+      })
+      .catch((error) => {
+        // Refresh tokens are single-use: another tab may have rotated it first
+        if (localStorage.getItem('refreshToken') !== refreshToken) {
+          return localStorage.getItem('token');
+        }
+        throw error;
+      })
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
+// Drop the stored session and send the user back to the login page
+const signOut = (redirect = true) => {
+  localStorage.removeItem('token');
+  localStorage.removeItem('refreshToken');
+  localStorage.removeItem('user');
+  if (redirect) {
+    window.location.href = '/login';
+  }
+};
+
 // Response interceptor for error handling
 apiClient.interceptors.response.use(
   (response) => response,
-  (error) => {
+  async (error) => {
+    const originalRequest = error.config;
+    const isAuthRequest = originalRequest?.url?.startsWith('/api/auth/');
+
     if (error.response?.status === 401) {
+      // Access token expired: refresh it once and retry the request
+      if (!isAuthRequest && !originalRequest._retry && localStorage.getItem('refreshToken')) {
+        originalRequest._retry = true;
+        try {
+          const token = await refreshAccessToken();
+          originalRequest.headers.Authorization = `Bearer ${token}`;
+          return apiClient(originalRequest);
+        } catch (refreshError) {
+          // Fall through to sign out
+        }
+      }
+
       // Token expired or invalid
-      localStorage.removeItem('token');
-      localStorage.removeItem('user');
-      window.location.href = '/login';
+      signOut(!isAuthRequest);
     }
     return Promise.reject(error);
   }
@@ -43,6 +93,7 @@ export default apiClient;
 export const auth = {
   login: (credentials) => apiClient.post('/api/auth/login', credentials),
   register: (userData) => apiClient.post('/api/auth/register', userData),
+  logout: () => apiClient.post('/api/auth/logout'),
 };
 
 export const users = {
@@ -76,3 +127,95 @@ export const comments = {
   create: (data) => apiClient.post('/api/comments', data),
   delete: (id) => apiClient.delete(`/api/comments/${id}`),
 };
+
+// Server-Sent Events read with fetch, so the token travels in the Authorization
+// header (EventSource cannot set headers). Reconnects until unsubscribed and
+// reports 'resync' after a reconnect, since events may have been missed.
+const EVENT_RETRY_MS = 5000;
+
+const subscribeTicketEvents = (onEvent) => {
+  let stopped = false;
+  let connected = false;
+  let controller = null;
+
+  const dispatch = (frame) => {
+    let type = 'message';
+    const data = [];
+    frame.split('\n').forEach((line) => {
+      if (line.startsWith('event:')) type = line.slice(6).trim();
+      else if (line.startsWith('data:')) data.push(line.slice(5).trim());
+    });
+    if (data.length) onEvent(type, JSON.parse(data.join('\n')));
+  };
+
+  const run = async () => {
+    while (!stopped && localStorage.getItem('token')) {
+      controller = new AbortController();
+      try {
+        const response = await fetch(`${API_BASE_URL}/api/events/tickets`, {
+          headers: { Authorization: `Bearer ${localStorage.getItem('token')}` },
+          signal: controller.signal,
+        });
+        if (response.status === 401) {
+          try {
+            await refreshAccessToken();
+          } catch (refreshError) {
+            // Session is over: stop reconnecting and sign out like the interceptor
+            stopped = true;
+            signOut();
+            return;
+          }
+          continue;
+        }
+        if (!response.ok) throw new Error(`Event stream failed with status ${response.status}`);
+
+        if (connected) onEvent('resync', {});
+        connected = true;
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        for (;;) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          let boundary;
+          while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            dispatch(buffer.slice(0, boundary));
+            buffer = buffer.slice(boundary + 2);
+          }
+        }
+      } catch (error) {
+        if (stopped) return;
+      }
+      await new Promise((resolve) => setTimeout(resolve, EVENT_RETRY_MS));
+    }
+  };
+
+  run();
+  return () => {
+    stopped = true;
+    controller?.abort();
+  };
+};
+
+export const events = {
+  subscribeTickets: subscribeTicketEvents,
+};
+
+export const attachments = {
+  list: (ticketId) => apiClient.get(`/api/attachments/ticket/${ticketId}`),
+  upload: (ticketId, file) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    return apiClient.post(`/api/attachments/ticket/${ticketId}`, formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+  },
+  preview: (id, size = 'thumbnail') => apiClient.get(`/api/attachments/${id}/preview`, {
+    params: { size },
+    responseType: 'blob',
+  }),
+  download: (id) => apiClient.get(`/api/attachments/${id}/download`, { responseType: 'blob' }),
+  delete: (id) => apiClient.delete(`/api/attachments/${id}`),
+};
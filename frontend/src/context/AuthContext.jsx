@@ -32,6 +32,7 @@ export const AuthProvider = ({ children }) => {
     } catch (error) {
       console.error('Failed to load user:', error);
       localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
     } finally {
       setLoading(false);
     }
@@ -39,8 +40,9 @@ export const AuthProvider = ({ children }) => {
 
   const login = async (credentials) => {
     const response = await auth.login(credentials);
-    const { access_token } = response.data;
+    const { access_token, refresh_token } = response.data;
     localStorage.setItem('token', access_token);
+    localStorage.setItem('refreshToken', refresh_token);
     await loadUser();
   };
 
@@ -49,8 +51,15 @@ export const AuthProvider = ({ children }) => {
     return response.data;
   };
 
-  const logout = () => {
+  const logout = async () => {
+    try {
+      // Revoke the session's tokens on the server
+      await auth.logout();
+    } catch (error) {
+      console.error('Failed to sign out:', error);
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     setUser(null);
   };
 
@@ -1,7 +1,7 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { tickets as ticketsApi } from '../api/client';
+import { tickets as ticketsApi, events as eventsApi } from '../api/client';
 import { Ticket, Plus, TrendingUp, Clock, CheckCircle } from 'lucide-react';
 
 const Dashboard = () => {
@@ -15,26 +15,47 @@ const Dashboard = () => {
   });
   const [recentTickets, setRecentTickets] = useState([]);
   const [loading, setLoading] = useState(true);
+  const recentRef = useRef([]);
 
   useEffect(() => {
     loadDashboardData();
   }, []);
 
+  // Keep the recent tickets current from pushed changes
+  useEffect(() => {
+    const unsubscribe = eventsApi.subscribeTickets((type, data) => {
+      const current = recentRef.current;
+      const index = current.findIndex((ticket) => ticket.id === data.id);
+
+      if (type === 'ticket.created') {
+        applyRecentTickets([data, ...current].slice(0, 5));
+      } else if (type === 'ticket.updated' && index !== -1) {
+        applyRecentTickets(current.map((ticket) => (ticket.id === data.id ? { ...ticket, ...data } : ticket)));
+      } else if ((type === 'ticket.deleted' && index !== -1) || type === 'ticket.imported' || type === 'resync') {
+        loadDashboardData();
+      }
+    });
+    return unsubscribe;
+  }, []);
+
+  const applyRecentTickets = (allTickets) => {
+    recentRef.current = allTickets;
+    setRecentTickets(allTickets);
+
+    // Calculate stats
+    setStats({
+      total: allTickets.length,
+      new: allTickets.filter(t => t.status === 'new').length,
+      assigned: allTickets.filter(t => t.status === 'assigned').length,
+      inProgress: allTickets.filter(t => t.status === 'in_progress').length,
+      resolved: allTickets.filter(t => t.status === 'resolved').length,
+    });
+  };
+
   const loadDashboardData = async () => {
     try {
       const response = await ticketsApi.list({ limit: 5 });
-      const allTickets = response.data;
-
-      setRecentTickets(allTickets);
-
-      // Calculate stats
-      setStats({
-        total: allTickets.length,
-        new: allTickets.filter(t => t.status === 'new').length,
-        assigned: allTickets.filter(t => t.status === 'assigned').length,
-        inProgress: allTickets.filter(t => t.status === 'in_progress').length,
-        resolved: allTickets.filter(t => t.status === 'resolved').length,
-      });
+      applyRecentTickets(response.data);
     } catch (error) {
       console.error('Failed to load dashboard data:', error);
     } finally {
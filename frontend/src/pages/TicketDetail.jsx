@@ -1,8 +1,58 @@
 import React, { useState, useEffect } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { tickets as ticketsApi, comments as commentsApi, users } from '../api/client';
-import { ArrowLeft, MessageSquare, Send, Trash2 } from 'lucide-react';
+import {
+  tickets as ticketsApi, comments as commentsApi, attachments as attachmentsApi, users, events as eventsApi,
+} from '../api/client';
+import { ArrowLeft, MessageSquare, Send, Trash2, Paperclip, FileText } from 'lucide-react';
+
+const PREVIEW_RETRY_MS = 2000;
+const PREVIEW_MAX_RETRIES = 5;
+
+// Small server-generated thumbnail; the full file is only fetched on download
+const AttachmentThumbnail = ({ attachment }) => {
+  const [url, setUrl] = useState(null);
+
+  useEffect(() => {
+    let objectUrl = null;
+    let timer = null;
+    let cancelled = false;
+
+    const load = async (attempt) => {
+      try {
+        const res = await attachmentsApi.preview(attachment.id);
+        if (cancelled) return;
+        if (res.status === 202) {
+          // Still being generated
+          if (attempt < PREVIEW_MAX_RETRIES) {
+            timer = setTimeout(() => load(attempt + 1), PREVIEW_RETRY_MS);
+          }
+          return;
+        }
+        objectUrl = URL.createObjectURL(res.data);
+        setUrl(objectUrl);
+      } catch (error) {
+        // No preview for this file type; the icon is shown instead
+      }
+    };
+
+    load(0);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+      if (objectUrl) URL.revokeObjectURL(objectUrl);
+    };
+  }, [attachment.id]);
+
+  if (!url) {
+    return (
+      <div style={styles.thumbnailPlaceholder}>
+        <FileText size={32} />
+      </div>
+    );
+  }
+  return <img src={url} alt={attachment.file_name} style={styles.thumbnail} />;
+};
 
 const TicketDetail = () => {
   const { id } = useParams();
@@ -10,6 +60,7 @@ const TicketDetail = () => {
   const { user, isTechnician } = useAuth();
   const [ticket, setTicket] = useState(null);
   const [comments, setComments] = useState([]);
+  const [ticketAttachments, setTicketAttachments] = useState([]);
   const [technicians, setTechnicians] = useState([]);
   const [loading, setLoading] = useState(true);
   const [newComment, setNewComment] = useState('');
@@ -19,15 +70,38 @@ const TicketDetail = () => {
     loadTicketData();
   }, [id]);
 
+  // Apply pushed changes to this ticket and its comments
+  useEffect(() => {
+    const ticketId = parseInt(id);
+    const unsubscribe = eventsApi.subscribeTickets((type, data) => {
+      if (type === 'resync') {
+        loadTicketData();
+      } else if (type === 'ticket.updated' && data.id === ticketId) {
+        setTicket((current) => (current ? { ...current, ...data } : current));
+      } else if (type === 'ticket.deleted' && data.id === ticketId) {
+        navigate('/tickets');
+      } else if (type === 'comment.created' && data.ticket_id === ticketId) {
+        setComments((current) => (
+          current.some((comment) => comment.id === data.id) ? current : [...current, data]
+        ));
+      } else if (type === 'comment.deleted' && data.ticket_id === ticketId) {
+        setComments((current) => current.filter((comment) => comment.id !== data.id));
+      }
+    });
+    return unsubscribe;
+  }, [id]);
+
   const loadTicketData = async () => {
     try {
-      const [ticketRes, commentsRes] = await Promise.all([
+      const [ticketRes, commentsRes, attachmentsRes] = await Promise.all([
         ticketsApi.get(id),
         commentsApi.list(id),
+        attachmentsApi.list(id),
       ]);
 
       setTicket(ticketRes.data);
       setComments(commentsRes.data);
+      setTicketAttachments(attachmentsRes.data);
 
       // Load technicians if user is technician
       if (isTechnician()) {
@@ -59,6 +133,20 @@ const TicketDetail = () => {
     }
   };
 
+  const handleDownload = async (attachment) => {
+    try {
+      const res = await attachmentsApi.download(attachment.id);
+      const url = URL.createObjectURL(res.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = attachment.file_name;
+      link.click();
+      URL.revokeObjectURL(url);
+    } catch (error) {
+      alert('Failed to download attachment');
+    }
+  };
+
   const handleAddComment = async (e) => {
     e.preventDefault();
     if (!newComment.trim()) return;
@@ -155,6 +243,30 @@ const TicketDetail = () => {
         )}
       </div>
 
+      {ticketAttachments.length > 0 && (
+        <div className="card" style={styles.mainCard}>
+          <div className="card-header">
+            <Paperclip size={20} />
+            Attachments ({ticketAttachments.length})
+          </div>
+
+          <div style={styles.attachments}>
+            {ticketAttachments.map((attachment) => (
+              <button
+                key={attachment.id}
+                type="button"
+                style={styles.attachment}
+                onClick={() => handleDownload(attachment)}
+                title={`Download ${attachment.file_name}`}
+              >
+                <AttachmentThumbnail attachment={attachment} />
+                <span style={styles.attachmentName}>{attachment.file_name}</span>
+              </button>
+            ))}
+          </div>
+        </div>
+      )}
+
       <div className="card">
         <div className="card-header">
           <MessageSquare size={20} />
@@ -270,6 +382,46 @@ const styles = {
     display: 'flex',
     flexDirection: 'column',
   },
+  attachments: {
+    display: 'flex',
+    flexWrap: 'wrap',
+    gap: '12px',
+    marginTop: '20px',
+  },
+  attachment: {
+    display: 'flex',
+    flexDirection: 'column',
+    alignItems: 'center',
+    width: '140px',
+    padding: '8px',
+    border: '1px solid #e5e7eb',
+    borderRadius: '8px',
+    backgroundColor: '#f8fafc',
+    cursor: 'pointer',
+  },
+  thumbnail: {
+    width: '120px',
+    height: '120px',
+    objectFit: 'cover',
+    borderRadius: '4px',
+  },
+  thumbnailPlaceholder: {
+    display: 'flex',
+    alignItems: 'center',
+    justifyContent: 'center',
+    width: '120px',
+    height: '120px',
+    color: '#64748b',
+  },
+  attachmentName: {
+    marginTop: '8px',
+    fontSize: '12px',
+    color: '#1e293b',
+    maxWidth: '120px',
+    overflow: 'hidden',
+    textOverflow: 'ellipsis',
+    whiteSpace: 'nowrap',
+  },
   comments: {
     marginTop: '20px',
   },
@@ -1,12 +1,14 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { tickets as ticketsApi } from '../api/client';
+import { tickets as ticketsApi, events as eventsApi } from '../api/client';
 import { Plus, Filter } from 'lucide-react';
 
 const TicketList = () => {
-  const { isTechnician } = useAuth();
+  const { user, isTechnician } = useAuth();
   const [tickets, setTickets] = useState([]);
+  const ticketsRef = useRef([]);
+  const reloadTimer = useRef(null);
   const [loading, setLoading] = useState(true);
   const [filters, setFilters] = useState({
     status: '',
@@ -19,6 +21,60 @@ const TicketList = () => {
     loadTickets();
   }, [filters]);
 
+  // Apply pushed changes instead of re-fetching the whole list
+  useEffect(() => {
+    const matchesFilters = (ticket) =>
+      (!filters.status || ticket.status === filters.status) &&
+      (!filters.priority || ticket.priority === filters.priority) &&
+      (!filters.assigned_to_me || ticket.assigned_to === user?.id) &&
+      (!filters.created_by_me || ticket.created_by === user?.id);
+
+    const scheduleReload = () => {
+      clearTimeout(reloadTimer.current);
+      reloadTimer.current = setTimeout(loadTickets, 500);
+    };
+
+    const unsubscribe = eventsApi.subscribeTickets((type, data) => {
+      if (type === 'resync' || type === 'ticket.imported') {
+        scheduleReload();
+        return;
+      }
+      if (!type.startsWith('ticket.')) return;
+
+      const current = ticketsRef.current;
+      const index = current.findIndex((ticket) => ticket.id === data.id);
+      if (type === 'ticket.deleted') {
+        if (index !== -1) applyTickets(current.filter((ticket) => ticket.id !== data.id));
+        return;
+      }
+      if (index === -1 && !data.title) {
+        // Bulk updates only carry changed fields; fetch tickets we do not have
+        scheduleReload();
+        return;
+      }
+
+      const ticket = index === -1 ? data : { ...current[index], ...data };
+      if (!matchesFilters(ticket)) {
+        if (index !== -1) applyTickets(current.filter((t) => t.id !== data.id));
+      } else if (index === -1) {
+        applyTickets([ticket, ...current]);
+      } else {
+        applyTickets(current.map((t) => (t.id === data.id ? ticket : t)));
+      }
+    });
+
+    return () => {
+      unsubscribe();
+      clearTimeout(reloadTimer.current);
+    };
+  }, [filters, user?.id]);
+
+  // The ref lets consecutive events build on each other before React re-renders
+  const applyTickets = (list) => {
+    ticketsRef.current = list;
+    setTickets(list);
+  };
+
   const loadTickets = async () => {
     try {
       const params = {};
@@ -28,7 +84,7 @@ const TicketList = () => {
       if (filters.created_by_me) params.created_by_me = true;
 
       const response = await ticketsApi.list(params);
-      setTickets(response.data);
+      applyTickets(response.data);
     } catch (error) {
       console.error('Failed to load tickets:', error);
     } finally {